@@ -6,7 +6,10 @@ from extensions import db, migrate
 from models import schema
 from routes.player_routes import player_bp
 from routes.chat_routes import chat_bp
+from routes.sync_routes import sync_bp
+from routes.guesser_routes import guesser_bp
 from config import Config
+from commands import register_commands
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +28,8 @@ def create_app(config_name=None):
 
     if config_name == "production":
         app.config.from_object("config.ProductionConfig")
+        if not app.config["SECRET_KEY"]:
+            raise RuntimeError("SECRET_KEY must be set in production")
     else:
         app.config.from_object(Config)
 
@@ -49,6 +54,10 @@ def create_app(config_name=None):
     # Register blueprints
     app.register_blueprint(player_bp, url_prefix="/api/v1/players")
     app.register_blueprint(chat_bp, url_prefix="/api/v1/chat")
+    app.register_blueprint(sync_bp, url_prefix="/api/v1/sync")
+    app.register_blueprint(guesser_bp, url_prefix="/api/v1/guesser")
+
+    register_commands(app)
 
     # Error handlers
     @app.errorhandler(404)
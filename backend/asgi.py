@@ -0,0 +1,113 @@
+"""
+ASGI entry point: ``uvicorn asgi:app``.
+
+The long-lived streams - the chat SSE answer and sync job progress - are
+served by native async handlers on the event loop, so an open stream costs a
+coroutine instead of a worker thread. Every other route is the regular Flask
+app behind a WSGI adapter (a thread pool), unchanged. Under a WSGI server
+the same URLs are served by the blueprints as before.
+"""
+import asyncio
+import json
+import os
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import create_app
+from routes.sse import SSE_DONE, SSE_HEADERS, sse_data
+from routes.sync_routes import POLL_INTERVAL_SEC
+from services import job_service
+from services.bedrock_agent import stream_agent_events
+from services.chat_service import get_chat_response
+from services.chat_sessions import new_session_id, valid_session_id
+
+flask_app = create_app()
+
+
+def _cors():
+    # Same policy as Flask-CORS in create_app; OPTIONS preflights fall through to Flask
+    if os.getenv("FLASK_ENV") == "production":
+        origins = os.getenv("ALLOWED_ORIGINS", "https://yourdomain.com").split(",")
+    else:
+        origins = ["*"]
+    return [Middleware(CORSMiddleware, allow_origins=origins, allow_methods=["GET", "POST", "OPTIONS"],
+                       allow_headers=["Content-Type"])]
+
+
+async def chat(request):
+    """Async twin of POST /api/v1/chat (see routes/chat_routes.send_message)."""
+    try:
+        data = await request.json()
+    except ValueError:
+        return JSONResponse({"success": False, "error": "Invalid JSON body"}, status_code=400)
+    message = (data.get("message") or "").strip()
+    puuid = data.get("puuid")
+    session_id = data.get("session_id") or new_session_id()
+    if not message:
+        return JSONResponse({"success": False, "error": "Message is required"}, status_code=400)
+    if not valid_session_id(session_id):
+        return JSONResponse({"success": False, "error": "session_id must be a string of at most 128 characters"},
+                            status_code=400)
+
+    if not data.get("stream", True):
+        try:
+            response = await run_in_threadpool(get_chat_response, message, puuid, flask_app, session_id)
+        except Exception as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+        return JSONResponse({"success": True, "response": response, "session_id": session_id})
+
+    async def events():
+        yield sse_data(json.dumps({"type": "session", "session_id": session_id}), event="session")
+        try:
+            async for event in stream_agent_events(message, puuid, flask_app, session_id):
+                if event["type"] == "text":
+                    yield sse_data(event["data"])
+                else:
+                    yield sse_data(json.dumps(event), event=event["type"])
+            yield SSE_DONE
+        except Exception as e:
+            yield f"data: [ERROR] {str(e)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _job_state(job_id):
+    with flask_app.app_context():
+        job = job_service.get_job(job_id)
+        return job.to_dict() if job else None
+
+
+async def sync_events(request):
+    """Async twin of GET /api/v1/sync/<job_id>/events: each poll borrows a thread only for its query."""
+    job_id = request.path_params["job_id"]
+    job = await run_in_threadpool(_job_state, job_id)
+    if job is None:
+        return JSONResponse({"error": "Sync job not found"}, status_code=404)
+
+    async def events(job):
+        last = None
+        while True:
+            state = (job["status"], job["processed_count"])
+            if state != last:
+                yield sse_data(json.dumps(job))
+                last = state
+            if job["status"] not in job_service.ACTIVE_STATUSES:
+                yield SSE_DONE
+                return
+            await asyncio.sleep(POLL_INTERVAL_SEC)
+            job = await run_in_threadpool(_job_state, job_id)
+
+    return StreamingResponse(events(job), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+app = Starlette(routes=[
+    Route("/api/v1/chat", chat, methods=["POST"], middleware=_cors()),
+    Route("/api/v1/sync/{job_id:int}/events", sync_events, methods=["GET"], middleware=_cors()),
+    Mount("/", app=WSGIMiddleware(flask_app)),
+])
@@ -0,0 +1,27 @@
+"""Helpers shared by the benchmark scripts."""
+import subprocess
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of durations in seconds, in milliseconds (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[int(pct / 100 * (len(ordered) - 1))] * 1000, 1)
+
+
+def latency_summary(values, prefix=""):
+    """p50 / p99 / max of durations in seconds, in milliseconds."""
+    return {
+        f"{prefix}p50_ms": percentile(values, 50),
+        f"{prefix}p99_ms": percentile(values, 99),
+        f"{prefix}max_ms": percentile(values, 100),
+    }
+
+
+def git_commit(cwd):
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
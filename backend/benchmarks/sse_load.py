@@ -0,0 +1,150 @@
+"""
+Concurrent SSE capacity test for the chat (or sync progress) stream.
+
+Opens N streams at once and reports how many were being served at the same
+time, time to first event and total stream time. Point it at a running
+server with --base-url, or let it start one with --serve:
+
+    # before: gunicorn sync workers (one stream per worker)
+    python benchmarks/sse_load.py --serve wsgi --workers 4 --connections 200
+    # after: uvicorn + asgi.py (streams driven by the event loop)
+    python benchmarks/sse_load.py --serve asgi --connections 200
+
+--serve runs the server with CHAT_MODEL_BACKEND=fake, so no AWS access is needed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench_utils import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _one_stream(client, args, started_at, spans):
+    t0 = time.perf_counter()
+    first = None
+    try:
+        if args.target == "chat":
+            request = client.stream("POST", "/api/v1/chat", json={"message": args.message})
+        else:
+            request = client.stream("GET", f"/api/v1/sync/{args.job_id}/events")
+        async with request as resp:
+            if resp.status_code != 200:
+                return {"ok": False, "error": f"HTTP {resp.status_code}"}
+            async for line in resp.aiter_lines():
+                if first is None and line.startswith(("data:", "event:")):
+                    first = time.perf_counter()
+                if line == "data: [DONE]":
+                    break
+            else:
+                return {"ok": False, "error": "stream ended without [DONE]"}
+    except (httpx.HTTPError, asyncio.TimeoutError) as e:
+        return {"ok": False, "error": type(e).__name__}
+    end = time.perf_counter()
+    spans.append((first - started_at, end - started_at))
+    return {"ok": True, "ttfb": first - t0, "total": end - t0}
+
+
+def _peak_concurrency(spans):
+    edges = sorted([(start, 1) for start, _ in spans] + [(end, -1) for _, end in spans])
+    peak = current = 0
+    for _, delta in edges:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+async def run_load(args):
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=0)
+    timeout = httpx.Timeout(args.timeout)
+    spans = []
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*[
+            _one_stream(client, args, started_at, spans) for _ in range(args.connections)
+        ])
+        wall = time.perf_counter() - started_at
+
+    ok = [r for r in results if r["ok"]]
+    errors = {}
+    for r in results:
+        if not r["ok"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    return {
+        "target": args.target,
+        "connections": args.connections,
+        "completed": len(ok),
+        "errors": errors,
+        "peak_concurrent_streams": _peak_concurrency(spans),
+        "wall_sec": round(wall, 3),
+        "ttfb_p50_ms": percentile([r["ttfb"] for r in ok], 50),
+        "ttfb_p99_ms": percentile([r["ttfb"] for r in ok], 99),
+        "stream_p50_ms": percentile([r["total"] for r in ok], 50),
+        "stream_p99_ms": percentile([r["total"] for r in ok], 99),
+    }
+
+
+def start_server(mode, port, workers):
+    env = {**os.environ, "CHAT_MODEL_BACKEND": "fake", "SYNC_WORKERS": "0"}
+    if mode == "wsgi":
+        cmd = [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+               "--worker-class", "sync", "--timeout", "120", "app:create_app()"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/chat/kb-cache", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", choices=["wsgi", "asgi"], help="Start this server for the run.")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers for --serve wsgi.")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--target", choices=["chat", "sync"], default="chat")
+    parser.add_argument("--job-id", type=int, help="Sync job to follow for --target sync.")
+    parser.add_argument("--message", default="How is the jungle meta this patch?")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-stream timeout in seconds.")
+    parser.add_argument("--out", help="Also write the JSON report to this file.")
+    args = parser.parse_args(argv)
+    if args.target == "sync" and args.job_id is None:
+        parser.error("--target sync needs --job-id")
+
+    proc = None
+    if args.serve:
+        port = int(args.base_url.rsplit(":", 1)[1].split("/")[0])
+        proc = start_server(args.serve, port, args.workers)
+    try:
+        report = asyncio.run(run_load(args))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+    report["server"] = args.serve or args.base_url
+    if args.serve == "wsgi":
+        report["workers"] = args.workers
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
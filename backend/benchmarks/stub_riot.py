@@ -0,0 +1,294 @@
+"""
+Local stub of the Riot account-v1, match-v5 and champion-mastery-v4 endpoints used by the backend.
+
+Serves a deterministic synthetic world (players, matches, timelines) with
+configurable response latency, advertised + enforced app rate limits and
+randomly injected 429s. Point the backend at it with
+RIOT_API_BASE_URL=http://127.0.0.1:<port> (all routing regions share it).
+
+    python benchmarks/stub_riot.py --port 8010 --latency-ms 40 --error-rate 0.02
+
+GET /__stats returns request counters; GET /__reset clears them.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+CHAMPIONS = ["Ahri", "Lux", "Garen", "Jinx", "LeeSin", "Thresh", "Yasuo", "Ezreal", "Leona", "Darius"]
+ROLES = ["SOLO", "NONE", "CARRY", "SUPPORT", "DUO"]
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+QUEUES = [420, 420, 420, 440, 450]
+WORLD_DAYS = 300  # matches are spread over this many days before now
+
+
+class World:
+    """Deterministic players and matches; match n is generated from its own seed on demand."""
+
+    def __init__(self, players=200, matches=1500, seed=7, days=WORLD_DAYS, prefix="NA1"):
+        self.seed = seed
+        self.prefix = prefix
+        self.puuids = [f"bench-puuid-{i:05d}" for i in range(players)]
+        self.now_ms = int(time.time() * 1000)
+        self.days = days
+        self.matches = matches
+        self.mastery_epoch = 0
+        # puuid -> match ids, newest first (ids are numbered oldest first)
+        self.by_puuid = {p: [] for p in self.puuids}
+        for n in reversed(range(matches)):
+            for puuid in self._players_of(n):
+                self.by_puuid[puuid].append(self.match_id(n))
+
+    def match_id(self, n):
+        return f"{self.prefix}_{n}"
+
+    def _rng(self, n):
+        return random.Random(self.seed * 1_000_003 + n)
+
+    def _players_of(self, n):
+        return self._rng(n).sample(self.puuids, 10)
+
+    def start_ms(self, n):
+        span = self.days * 86400 * 1000
+        return self.now_ms - span + span * (n + 1) // (self.matches + 1)
+
+    def match(self, n):
+        rng = self._rng(n)
+        players = rng.sample(self.puuids, 10)
+        blue_wins = rng.random() < 0.5
+        participants = []
+        for i, puuid in enumerate(players):
+            blue = i < 5
+            participants.append({
+                "puuid": puuid,
+                "participantId": i + 1,
+                "riotIdGameName": f"Bench{puuid[-5:]}",
+                "riotIdTagline": self.prefix,
+                "teamId": 100 if blue else 200,
+                "championName": rng.choice(CHAMPIONS),
+                "win": blue == blue_wins,
+                "role": rng.choice(ROLES),
+                "teamPosition": POSITIONS[i % 5],
+                "kills": rng.randint(0, 15),
+                "deaths": rng.randint(0, 12),
+                "assists": rng.randint(0, 20),
+                "goldEarned": rng.randint(6000, 18000),
+                "totalDamageDealtToChampions": rng.randint(4000, 50000),
+            })
+        return {
+            "metadata": {"matchId": self.match_id(n), "participants": players},
+            "info": {
+                "queueId": rng.choice(QUEUES),
+                "gameStartTimestamp": self.start_ms(n),
+                "gameDuration": rng.randint(1200, 2400),
+                "participants": participants,
+            },
+        }
+
+    def timeline(self, n):
+        rng = random.Random(self.seed * 7_000_001 + n)
+        frames = []
+        for _ in range(rng.randint(20, 35)):
+            events = [{"type": "WARD_PLACED"}]
+            for _ in range(rng.randint(0, 3)):
+                events.append({
+                    "type": "CHAMPION_KILL",
+                    "killerId": rng.randint(0, 10),
+                    "victimId": rng.randint(1, 10),
+                    "assistingParticipantIds": rng.sample(range(1, 11), rng.randint(0, 3)),
+                    "position": {"x": rng.randint(0, 14800), "y": rng.randint(0, 14800)},
+                })
+            frames.append({"events": events})
+        return {"metadata": {"matchId": self.match_id(n)}, "info": {"frames": frames}}
+
+    def mastery(self, puuid):
+        """champion-mastery-v4 list; points grow with `mastery_epoch` so repeated syncs see changes."""
+        rng = random.Random(f"{self.seed}-{puuid}")
+        entries = []
+        for champion_id in sorted(rng.sample(range(1, 170), 40)):
+            points = rng.randint(500, 300000) + self.mastery_epoch * rng.choice((0, 0, 0, 1200))
+            entries.append({
+                "puuid": puuid,
+                "championId": champion_id,
+                "championLevel": min(points // 12000 + 1, 50),
+                "championPoints": points,
+                "lastPlayTime": self.now_ms - rng.randint(0, self.days) * 86400 * 1000,
+            })
+        return sorted(entries, key=lambda e: -e["championPoints"])
+
+    def ids(self, puuid, start_time=None, end_time=None, start=0, count=20):
+        ids = self.by_puuid.get(puuid, [])
+        if start_time is not None or end_time is not None:
+            lo = (start_time or 0) * 1000
+            hi = (end_time or 1 << 62) * 1000
+            ids = [m for m in ids if lo <= self.start_ms(int(m.split("_")[1])) <= hi]
+        return ids[start:start + count]
+
+
+class _Window:
+    def __init__(self, limit, seconds):
+        self.limit, self.seconds = limit, seconds
+        self.started, self.count = 0.0, 0
+
+    def hit(self, now):
+        if now - self.started >= self.seconds:
+            self.started, self.count = now, 0
+        self.count += 1
+        return self.count <= self.limit
+
+
+class StubRiot:
+    def __init__(self, world=None, latency_ms=30, jitter_ms=10, rate_limit="500:1", error_rate=0.0,
+                 retry_after=1, seed=7):
+        self.world = world or World(seed=seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._windows = [_Window(*map(int, part.split(":"))) for part in rate_limit.split(",")]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {}
+        self.reset()
+        self.server = None
+
+    def reset(self):
+        with self._lock:
+            self.stats = {"requests": 0, "rate_limited": 0, "injected_429": 0, "not_found": 0}
+
+    def _admit(self):
+        """(status, extra headers): 429 when over an advertised limit or when an error is injected."""
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            counts = []
+            allowed = True
+            for w in self._windows:
+                allowed = w.hit(now) and allowed
+                counts.append(f"{w.count}:{w.seconds}")
+            headers = {"X-App-Rate-Limit": self.rate_limit, "X-App-Rate-Limit-Count": ",".join(counts)}
+            if not allowed:
+                self.stats["rate_limited"] += 1
+                return 429, {**headers, "Retry-After": str(self.retry_after), "X-Rate-Limit-Type": "application"}
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.stats["injected_429"] += 1
+                return 429, {**headers, "Retry-After": str(self.retry_after), "X-Rate-Limit-Type": "service"}
+            return 200, headers
+
+    def handle(self, path, query):
+        if path == "/__stats":
+            return 200, {}, dict(self.stats)
+        if path == "/__reset":
+            self.reset()
+            return 200, {}, {}
+
+        status, headers = self._admit()
+        delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        time.sleep(max(delay, 0) / 1000)
+        if status != 200:
+            return status, headers, {"status": {"status_code": status, "message": "Rate limit exceeded"}}
+
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        if path.startswith("/riot/account/v1/accounts/by-riot-id/") and len(parts) == 7:
+            game_name = parts[5]
+            suffix = game_name[len("Bench"):]
+            puuid = f"bench-puuid-{suffix}"
+            if game_name.startswith("Bench") and puuid in self.world.by_puuid:
+                return 200, headers, {"puuid": puuid, "gameName": game_name, "tagLine": parts[6]}
+        elif path.startswith("/lol/champion-mastery/v4/champion-masteries/by-puuid/") and len(parts) == 6:
+            if parts[5] in self.world.by_puuid:
+                return 200, headers, self.world.mastery(parts[5])
+        elif path.startswith("/lol/match/v5/matches/by-puuid/") and path.endswith("/ids"):
+            ids = self.world.ids(
+                parts[5],
+                start_time=int(query["startTime"]) if "startTime" in query else None,
+                end_time=int(query["endTime"]) if "endTime" in query else None,
+                start=int(query.get("start", 0)),
+                count=int(query.get("count", 20)),
+            )
+            return 200, headers, ids
+        elif path.startswith("/lol/match/v5/matches/"):
+            match_id = parts[4]
+            prefix, _, number = match_id.partition("_")
+            if prefix == self.world.prefix and number.isdigit() and int(number) < self.world.matches:
+                n = int(number)
+                return 200, headers, self.world.timeline(n) if path.endswith("/timeline") else self.world.match(n)
+
+        with self._lock:
+            self.stats["not_found"] += 1
+        return 404, headers, {"status": {"status_code": 404, "message": "Data not found"}}
+
+    def start(self, host="127.0.0.1", port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, headers, payload = stub.handle(url.path, query)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def add_arguments(parser):
+    parser.add_argument("--players", type=int, default=200, help="Synthetic players in the world.")
+    parser.add_argument("--matches", type=int, default=1500, help="Synthetic matches in the world.")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Added latency per Riot response.")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--rate-limit", default="500:1", help="Advertised and enforced app limit, e.g. 20:1,100:120.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an injected 429.")
+    parser.add_argument("--seed", type=int, default=7)
+
+
+def from_args(args):
+    world = World(players=args.players, matches=args.matches, seed=args.seed)
+    return StubRiot(world, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit=args.rate_limit,
+                    error_rate=args.error_rate, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    stub = from_args(args).start(args.host, args.port)
+    print(f"Stub Riot API on {stub.base_url} ({args.players} players, {args.matches} matches); Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
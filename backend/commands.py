@@ -0,0 +1,196 @@
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from extensions import db
+from models.schema import Match, MatchTimeline, Participant, Player, PlayerDailyActivity, PlayerStat
+from services import bulk_sync_service, calendar_service, guesser_service, job_service, mastery_service, stats_service
+from services.query_plans import check_query_plans
+from services.match_cache import TIMELINE_SUFFIX, get_match_cache
+from services.match_service import ingest_matches, reconcile_player_matches, sync_players
+from services.riot_api import ROUTING_REGIONS
+
+
+@click.command("reingest-matches")
+@click.option("--truncate", is_flag=True, help="Delete all matches, participants, timelines and rollups before re-ingesting.")
+@click.option("--batch", default=200, show_default=True, help="Matches per ingest batch / commit.")
+@with_appcontext
+def reingest_matches_command(truncate, batch):
+    """Rebuild the matches/participants tables from the raw match cache (no network)."""
+    cache = get_match_cache()
+    if cache is None:
+        raise click.ClickException("MATCH_CACHE_PATH is not configured")
+
+    if truncate:
+        PlayerStat.query.delete()
+        PlayerDailyActivity.query.delete()
+        MatchTimeline.query.delete()
+        Participant.query.delete()
+        Match.query.delete()
+        db.session.commit()
+
+    pending, timelines, inserted, seen = [], {}, 0, 0
+    for match_json in cache.iter_matches(batch=batch):
+        match_id = match_json["metadata"]["matchId"]
+        pending.append(match_json)
+        timelines[match_id] = cache.get(f"{match_id}{TIMELINE_SUFFIX}")
+        seen += 1
+        if len(pending) >= batch:
+            inserted += ingest_matches(pending, timelines)
+            db.session.commit()
+            pending, timelines = [], {}
+            click.echo(f"Re-ingested {seen} cached matches ({inserted} new)...")
+    inserted += ingest_matches(pending, timelines)
+    db.session.commit()
+    click.echo(f"Done: {seen} cached matches, {inserted} inserted.")
+
+
+@click.command("rebuild-stats")
+@with_appcontext
+def rebuild_stats_command():
+    """Recompute the player_stats rollup from the participants table."""
+    rows = stats_service.rebuild_player_stats()
+    db.session.commit()
+    click.echo(f"Rebuilt player_stats from {rows} participant rows.")
+
+
+@click.command("rebuild-calendar")
+@click.option("--puuid", "puuids", multiple=True, help="Only these players (repeatable); default all.")
+@with_appcontext
+def rebuild_calendar_command(puuids):
+    """Recompute the player_daily_activity index from the participants table."""
+    player_ids = None
+    if puuids:
+        player_ids = [p.id for p in Player.query.filter(Player.puuid.in_(puuids))]
+    rows = calendar_service.rebuild_daily_activity(player_ids)
+    db.session.commit()
+    click.echo(f"Rebuilt player_daily_activity from {rows} participant rows.")
+
+
+@click.command("build-guesser-pools")
+@click.option("--force", is_flag=True, help="Rebuild pools whose source data is unchanged too.")
+@with_appcontext
+def build_guesser_pools_command(force):
+    """Rebuild the global and every tracked player's League Guesser question pool."""
+    rebuilt = 0
+    for player in Player.query.filter(Player.tracked.is_(True)).order_by(Player.id).all():
+        pool = guesser_service.get_pool(player)
+        version = pool.version if pool else None
+        rebuilt += guesser_service.build_pool(player, force=force).version != version
+        db.session.commit()
+    pool = guesser_service.build_pool(None, force=force)
+    db.session.commit()
+    click.echo(f"Rebuilt {rebuilt} player pools; global pool has {pool.size} questions.")
+
+
+@click.command("check-query-plans")
+@click.option("--verbose", is_flag=True, help="Print the full plan of every query.")
+@with_appcontext
+def check_query_plans_command(verbose):
+    """EXPLAIN the hot queries and fail if any of them doesn't use its index."""
+    failed = 0
+    for r in check_query_plans():
+        status = "ok" if r["ok"] else "MISSING INDEX"
+        click.echo(f"{r['name']:<16} {status:<14} used={r['used']} expected={r['expected']}")
+        if verbose or not r["ok"]:
+            click.echo(f"    {r['plan']}")
+        failed += not r["ok"]
+    if failed:
+        raise click.ClickException(f"{failed} hot queries are not using their indexes")
+
+
+@click.command("sync-players")
+@click.argument("puuids", nargs=-1, required=True)
+@click.option("--region", default="americas", show_default=True, help="Routing region shared by these players.")
+@click.option("--year", default=2025, show_default=True)
+@with_appcontext
+def sync_players_command(puuids, region, year):
+    """Sync several players at once, fetching games they share only once."""
+    out = sync_players(list(puuids), current_year=year, region=region)
+    click.echo(f"Synced {out['players']} players: {out['counters']}")
+    click.echo(f"Fetch stats: {out['fetch_stats']}")
+
+
+@click.command("sync-mastery")
+@click.argument("puuids", nargs=-1)
+@with_appcontext
+def sync_mastery_command(puuids):
+    """Refresh champion mastery of the given players (default: all tracked), storing only changed champions."""
+    counters = mastery_service.sync_mastery(list(puuids) or None)
+    click.echo(f"Mastery synced: {counters}")
+
+
+@click.command("reconcile-matches")
+@click.argument("puuid")
+@click.option("--region", default=None, help="Routing region (default: the player's).")
+@click.option("--year", default=2025, show_default=True)
+@click.option("--window-days", default=7, show_default=True, help="Size of the windows checked for gaps.")
+@with_appcontext
+def reconcile_matches_command(puuid, region, year, window_days):
+    """Detect gaps in a player's stored match history and backfill only those windows."""
+    player = Player.query.filter_by(puuid=puuid).first()
+    if player is None:
+        raise click.ClickException("Player not found")
+    out = reconcile_player_matches(puuid, current_year=year, region=region or player.region, window_days=window_days)
+    for gap in out["gaps"]:
+        click.echo(f"Backfilled {gap['missing']} matches between {datetime.fromtimestamp(gap['from'])} and {datetime.fromtimestamp(gap['to'])}")
+    click.echo(f"Done: {len(out['gaps'])} windows with gaps, {out['counters']}")
+
+
+@click.command("sync-all")
+@click.option("--puuid", "puuids", multiple=True, help="Only sync these players (repeatable).")
+@click.option("--region", "regions", multiple=True, type=click.Choice(ROUTING_REGIONS), help="Only sync players of these routing regions (repeatable).")
+@click.option("--year", default=2025, show_default=True)
+@click.option("--batch", type=int, help="Players per checkpointed batch (default SYNC_ALL_BATCH).")
+@click.option("--resume", is_flag=True, help="Continue the last unfinished run instead of starting a new one.")
+@with_appcontext
+def sync_all_command(puuids, regions, year, batch, resume):
+    """Sync all tracked players, oldest first, with one worker per routing region."""
+    active = bulk_sync_service.get_active_run()
+    if active:
+        raise click.ClickException(f"Sync run {active.id} is still in progress")
+
+    run = None
+    if resume:
+        run = bulk_sync_service.get_resumable_run()
+        if run is None:
+            raise click.ClickException("No unfinished sync run to resume")
+        click.echo(f"Resuming sync run {run.id}")
+    else:
+        run = bulk_sync_service.create_run(puuids=list(puuids) or None, regions=list(regions) or None, year=year)
+        click.echo(f"Started sync run {run.id}")
+
+    def on_batch(region, items):
+        failed = sum(i.status == "failed" for i in items)
+        click.echo(f"[{region}] synced {len(items) - failed} players" + (f", {failed} failed" if failed else ""))
+
+    run = bulk_sync_service.execute_run(run.id, batch_size=batch, on_batch=on_batch)
+    progress = bulk_sync_service.run_progress(run)
+    click.echo(f"Sync run {run.id} {run.status}: {progress['totals']}")
+
+
+@click.command("sync-worker")
+@click.option("--workers", default=2, show_default=True, help="Worker threads in this process.")
+@with_appcontext
+def sync_worker_command(workers):
+    """Run sync job workers in the foreground, draining the queue shared with the web app."""
+    app = current_app._get_current_object()
+    threads = job_service.start_sync_workers(app, count=workers)
+    click.echo(f"Started {len(threads)} sync workers; Ctrl+C to stop.")
+    for t in threads:
+        t.join()
+
+
+def register_commands(app):
+    app.cli.add_command(reingest_matches_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(rebuild_calendar_command)
+    app.cli.add_command(build_guesser_pools_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(sync_players_command)
+    app.cli.add_command(sync_mastery_command)
+    app.cli.add_command(sync_all_command)
+    app.cli.add_command(reconcile_matches_command)
+    app.cli.add_command(sync_worker_command)
@@ -8,6 +8,41 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///league.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     RIOT_API_KEY = os.getenv("RIOT_API_KEY")
+    # App-wide limit of the Riot key, refined at runtime from the X-App-Rate-Limit header
+    RIOT_APP_RATE_LIMIT = os.getenv("RIOT_APP_RATE_LIMIT", "20:1,100:120")
+    RIOT_FETCH_WORKERS = int(os.getenv("RIOT_FETCH_WORKERS", 8))
+    # "{region}" is filled with the routing region; point at a local stub Riot server for testing
+    RIOT_API_BASE_URL = os.getenv("RIOT_API_BASE_URL", "https://{region}.api.riotgames.com")
+    RIOT_CONNECT_TIMEOUT = float(os.getenv("RIOT_CONNECT_TIMEOUT", 3.05))
+    RIOT_READ_TIMEOUT = float(os.getenv("RIOT_READ_TIMEOUT", 10))
+    RIOT_HTTP_POOL_SIZE = int(os.getenv("RIOT_HTTP_POOL_SIZE", 16))
+    # Compressed raw match payloads; set MATCH_CACHE_PATH="" to disable
+    MATCH_CACHE_PATH = os.getenv("MATCH_CACHE_PATH", "match_cache.db")
+    MATCH_CACHE_MAX_MB = int(os.getenv("MATCH_CACHE_MAX_MB", 2048))
+    # Also fetch match timelines (one extra Riot call per match) for kill/death heatmaps
+    FETCH_TIMELINES = os.getenv("FETCH_TIMELINES", "true").lower() == "true"
+    # Refresh champion mastery of synced players (one Riot call per player)
+    SYNC_MASTERY = os.getenv("SYNC_MASTERY", "true").lower() == "true"
+    # Background sync workers per web process (0 = only `flask sync-worker` processes drain the queue)
+    SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", 2))
+    SYNC_POLL_INTERVAL = float(os.getenv("SYNC_POLL_INTERVAL", 2))
+    SYNC_JOB_STALE_SEC = int(os.getenv("SYNC_JOB_STALE_SEC", 600))
+    # Riot ID -> puuid resolutions kept in process; "not found" answers expire sooner
+    PUUID_CACHE_MAX_ENTRIES = int(os.getenv("PUUID_CACHE_MAX_ENTRIES", 10000))
+    PUUID_CACHE_TTL_SEC = int(os.getenv("PUUID_CACHE_TTL_SEC", 86400))
+    PUUID_NEGATIVE_TTL_SEC = int(os.getenv("PUUID_NEGATIVE_TTL_SEC", 300))
+    # Cached GET responses of per-player endpoints: memory (per process), sqlite (shared file) or none
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "response_cache.db")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+    # Players per sync_players() call in `flask sync-all` / POST /api/v1/sync/runs (one checkpoint per batch)
+    SYNC_ALL_BATCH = int(os.getenv("SYNC_ALL_BATCH", 20))
+    # Shared secret for admin endpoints (X-Admin-Token header); admin endpoints are disabled when unset
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    # Token budget (~4 characters each) of the player summary added to the chat system prompt
+    CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", 300))
+    # Signs League Guesser session tokens; set a long random value in production
+    SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
     JSON_SORT_KEYS = False
 
 
@@ -31,10 +66,14 @@ class ProductionConfig(Config):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace(
             "postgres://", "postgresql://", 1
         )
+    # No public default: with it anyone could sign League Guesser session tokens (checked in create_app)
+    SECRET_KEY = os.getenv("SECRET_KEY")
 
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    MATCH_CACHE_PATH = ""
+    SYNC_WORKERS = 0
     WTF_CSRF_ENABLED = False
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""participant integer foreign keys
+
+Revision ID: 3f1c2a9b7e41
+Revises: d960d00c07e8
+Create Date: 2026-10-18 10:12:40.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7e41'
+down_revision = 'd960d00c07e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Earlier ingestion wrote the Riot match id and the puuid into
+    # participants.match_id / participants.player_id. SQLite accepted the text
+    # values despite the INTEGER columns; rewrite them as real foreign keys.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "UPDATE participants SET match_id = "
+        "(SELECT matches.id FROM matches WHERE matches.match_id = participants.match_id) "
+        "WHERE typeof(match_id) = 'text'"
+    )
+    op.execute(
+        "UPDATE participants SET player_id = "
+        "(SELECT players.id FROM players WHERE players.puuid = participants.player_id) "
+        "WHERE typeof(player_id) = 'text'"
+    )
+
+
+def downgrade():
+    # Data-only fix; nothing to undo
+    pass
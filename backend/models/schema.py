@@ -1,3 +1,7 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, event
+
 from extensions import db
 
 class Player(db.Model):
@@ -6,8 +10,21 @@ class Player(db.Model):
     puuid = db.Column(db.String, unique=True, nullable=False)
     game_name = db.Column(db.String, nullable=False)
     tag_line = db.Column(db.String, nullable=False)
+    region = db.Column(db.String, nullable=False, default="americas", server_default="americas") # match-v5 routing region
+    platform = db.Column(db.String) # platform routing value (e.g. "NA1") for per-server APIs; learned from match ids
+    # Case-folded "game_name#tag_line" for directory order and prefix search ("" while the Riot ID is unknown)
+    riot_id_norm = db.Column(db.String, nullable=False, default="", server_default="")
+    timezone = db.Column(db.String, nullable=False, default="UTC", server_default="UTC") # IANA name; calendar days are bucketed in it
     participants = db.relationship("Participant", back_populates="player")
     last_updated = db.Column(db.DateTime, default=None) # timestamp of last update
+    data_changed_at = db.Column(db.DateTime) # UTC; bumped whenever ingestion adds games for this player
+    # Added through the API (or synced); co-participants stored only as match rows stay untracked
+    tracked = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    __table_args__ = (
+        db.Index("ix_players_riot_id_norm", "riot_id_norm", "id"),
+        db.Index("ix_players_tracked", "tracked", "id"),
+    )
 
     def to_dict(self):
         return {
@@ -15,9 +32,23 @@ class Player(db.Model):
             "puuid": self.puuid,
             "game_name": self.game_name,
             "tag_line": self.tag_line,
+            "region": self.region,
+            "platform": self.platform,
+            "timezone": self.timezone,
+            "tracked": self.tracked,
             "last_updated": self.last_updated
         }
 
+# Trigram index so prefix (and substring) LIKE search on PostgreSQL doesn't depend on the collation
+event.listen(
+    Player.__table__,
+    "after_create",
+    DDL(
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+        "CREATE INDEX IF NOT EXISTS ix_players_riot_id_norm_trgm ON players USING gin (riot_id_norm gin_trgm_ops)"
+    ).execute_if(dialect="postgresql"),
+)
+
 class Match(db.Model):
     __tablename__ = "matches"
     id = db.Column(db.Integer, primary_key=True)
@@ -26,6 +57,11 @@ class Match(db.Model):
     timestamp = db.Column(db.DateTime)
     participants = db.relationship("Participant", back_populates="match")
 
+    __table_args__ = (
+        db.Index("ix_matches_timestamp", "timestamp"),
+        db.Index("ix_matches_queue_timestamp", "queue_id", "timestamp"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -48,9 +84,19 @@ class Participant(db.Model):
     assists = db.Column(db.Integer)
     gold_earned = db.Column(db.Integer)
     damage_dealt = db.Column(db.Integer)
+    timestamp = db.Column(db.DateTime) # copy of Match.timestamp so a player's history is one index range
+    participant_id = db.Column(db.SmallInteger) # Riot participantId (1-10), used by timeline events
     match = db.relationship("Match", back_populates="participants") # create relationship to Match, enable participant.match 
     player = db.relationship("Player", back_populates="participants") # create relationship to Player, enable participant.player
 
+    __table_args__ = (
+        # Unique index (not constraint) so SQLite reports it by name in query plans; also the ON CONFLICT target
+        db.Index("uq_participants_match_player", "match_id", "player_id", unique=True),
+        db.Index("ix_participants_player_timestamp", "player_id", "timestamp"),
+        db.Index("ix_participants_match_team", "match_id", "team_id"),
+        db.Index("ix_participants_champion_role", "champion_name", "role"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -64,5 +110,238 @@ class Participant(db.Model):
             "deaths": self.deaths,
             "assists": self.assists,
             "gold_earned": self.gold_earned,
-            "damage_dealt": self.damage_dealt
-        }
\ No newline at end of file
+            "damage_dealt": self.damage_dealt,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None
+        }
+
+
+class MatchTimeline(db.Model):
+    """
+    Champion-kill events of a match, stored column-wise as packed little-endian arrays
+    (one row per match instead of one row per event).
+    """
+    __tablename__ = "match_timelines"
+    id = db.Column(db.Integer, primary_key=True)
+    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"), unique=True, nullable=False)
+    event_count = db.Column(db.Integer, nullable=False)
+    x = db.Column(db.LargeBinary, nullable=False) # int16 map x
+    y = db.Column(db.LargeBinary, nullable=False) # int16 map y
+    killer = db.Column(db.LargeBinary, nullable=False) # int8 participantId (0 = tower/minion)
+    victim = db.Column(db.LargeBinary, nullable=False) # int8 participantId
+    assists = db.Column(db.LargeBinary, nullable=False) # int16 bitmask, bit n = participantId n assisted
+
+
+class PlayerStat(db.Model):
+    """Per-player rollup of participant rows, maintained incrementally during ingestion."""
+    __tablename__ = "player_stats"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    champion_name = db.Column(db.String, nullable=False)
+    role = db.Column(db.String, nullable=False)
+    queue_id = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.String(7), nullable=False) # "YYYY-MM" of the match start
+    games = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    kills = db.Column(db.Integer, nullable=False, default=0)
+    deaths = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    gold_earned = db.Column(db.Integer, nullable=False, default=0)
+    damage_dealt = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("player_id", "champion_name", "role", "queue_id", "month", name="uq_player_stats_key"),
+    )
+
+
+class ChampionMastery(db.Model):
+    """Latest champion-mastery-v4 entry per player and champion; rewritten only when it changes."""
+    __tablename__ = "champion_masteries"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    champion_id = db.Column(db.Integer, nullable=False) # Riot championId (mastery-v4 has no names)
+    champion_level = db.Column(db.Integer, nullable=False)
+    champion_points = db.Column(db.Integer, nullable=False)
+    last_play_time = db.Column(db.DateTime) # UTC
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Unique index (not constraint) so SQLite reports it by name in query plans; also the ON CONFLICT target
+        db.Index("uq_champion_masteries_player_champion", "player_id", "champion_id", unique=True),
+    )
+
+
+class ChampionMasteryHistory(db.Model):
+    """One point per observed change of a champion's mastery, for progression charts."""
+    __tablename__ = "champion_mastery_history"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    champion_id = db.Column(db.Integer, nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False) # UTC time of the sync that saw the change
+    champion_level = db.Column(db.Integer, nullable=False)
+    champion_points = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_champion_mastery_history_player_champion", "player_id", "champion_id", "recorded_at"),
+    )
+
+
+class GuesserPool(db.Model):
+    """A precomputed League Guesser question pool: one per player plus the global one."""
+    __tablename__ = "guesser_pools"
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String, unique=True, nullable=False) # "global" or "player:<players.id>"
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"))
+    version = db.Column(db.Integer, nullable=False, default=1) # bumped on every rebuild; sessions are bound to it
+    size = db.Column(db.Integer, nullable=False, default=0)
+    data_version = db.Column(db.String, nullable=False, default="") # source data the pool was built from
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class GuesserQuestion(db.Model):
+    __tablename__ = "guesser_questions"
+    id = db.Column(db.Integer, primary_key=True)
+    pool_id = db.Column(db.Integer, db.ForeignKey("guesser_pools.id"), nullable=False)
+    position = db.Column(db.Integer, nullable=False) # 0..size-1, addressed directly by sessions
+    kind = db.Column(db.String, nullable=False)
+    payload = db.Column(db.JSON, nullable=False) # {"prompt": {...}, "answer": {...}}
+
+    __table_args__ = (
+        db.Index("uq_guesser_questions_pool_position", "pool_id", "position", unique=True),
+    )
+
+
+class PlayerDailyActivity(db.Model):
+    """Per-player, per-day rollup of games (days in the player's timezone), maintained during ingestion."""
+    __tablename__ = "player_daily_activity"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    kills = db.Column(db.Integer, nullable=False, default=0)
+    deaths = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    match_ids = db.Column(db.Text, nullable=False, default="") # comma-separated Riot match ids, appended on upsert
+
+    __table_args__ = (
+        # Unique index (not constraint) so SQLite reports it by name in query plans; also the ON CONFLICT target
+        db.Index("uq_player_daily_activity_player_day", "player_id", "day", unique=True),
+    )
+
+
+class RewindSnapshot(db.Model):
+    """Materialized year-in-review report, valid while the player's last_updated is unchanged."""
+    __tablename__ = "rewind_snapshots"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    report_version = db.Column(db.Integer, nullable=False) # bumped when the report format changes
+    data_version = db.Column(db.String, nullable=False) # Player.last_updated|data_changed_at the report was built from
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("player_id", "year", name="uq_rewind_snapshots_player_year"),
+    )
+
+
+class SyncJob(db.Model):
+    __tablename__ = "sync_jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    puuid = db.Column(db.String, nullable=False)
+    region = db.Column(db.String, nullable=False, default="americas")
+    status = db.Column(db.String, nullable=False, default="queued") # queued, running, done, failed
+    processed_count = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime) # bumped on progress; a stale running job is reclaimed
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # At most one active job per player, so duplicate sync requests coalesce
+        db.Index(
+            "uq_sync_jobs_active_puuid", "puuid", unique=True,
+            postgresql_where=db.text("status IN ('queued', 'running')"),
+            sqlite_where=db.text("status IN ('queued', 'running')"),
+        ),
+        db.Index("ix_sync_jobs_status_id", "status", "id"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "puuid": self.puuid,
+            "region": self.region,
+            "status": self.status,
+            "processed_count": self.processed_count,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class SyncCursor(db.Model):
+    """
+    Progress through a player's current sync window, committed with every ingest batch.
+
+    An offset is enough to resume because the window is closed: `window_end` is
+    the time the cursor was created and never moves, so games played later are
+    outside the listing. The only ids that can still join it are games in progress
+    at `window_end` that finish afterwards; they are the newest in the window, land
+    at the front of Riot's newest-first list and shift the handled ids back, so
+    resuming at `next_offset` re-lists a few stored matches but never skips one.
+    """
+    __tablename__ = "sync_cursors"
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), unique=True, nullable=False)
+    window_start = db.Column(db.Integer, nullable=False) # epoch seconds, fixed until the window is done
+    window_end = db.Column(db.Integer, nullable=False) # frozen at creation, see above
+    next_offset = db.Column(db.Integer, nullable=False, default=0) # ids of Riot's newest-first list already handled
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SyncRun(db.Model):
+    """A bulk sync over many players (`flask sync-all`), checkpointed per item so it can be resumed."""
+    __tablename__ = "sync_runs"
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String, nullable=False, default="running") # running, done
+    filters = db.Column(db.JSON) # puuids / regions the run was created with
+    year = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    heartbeat_at = db.Column(db.DateTime) # bumped after every batch; a stale running run can be resumed
+    finished_at = db.Column(db.DateTime)
+    items = db.relationship("SyncRunItem", back_populates="run")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "filters": self.filters,
+            "year": self.year,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class SyncRunItem(db.Model):
+    __tablename__ = "sync_run_items"
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("sync_runs.id"), nullable=False)
+    puuid = db.Column(db.String, nullable=False)
+    region = db.Column(db.String, nullable=False)
+    priority = db.Column(db.Integer, nullable=False) # 0 = player with the oldest last_updated
+    status = db.Column(db.String, nullable=False, default="pending") # pending, done, failed
+    processed_count = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    finished_at = db.Column(db.DateTime)
+    run = db.relationship("SyncRun", back_populates="items")
+
+    __table_args__ = (
+        db.UniqueConstraint("run_id", "puuid", name="uq_sync_run_items_run_puuid"),
+        db.Index("ix_sync_run_items_next", "run_id", "region", "status", "priority"),
+    )
@@ -1,5 +1,11 @@
-from flask import Blueprint, request, jsonify, Response
-from services.chat_service import get_chat_response
+import json
+
+from flask import Blueprint, current_app, request, jsonify, Response
+from routes.sse import SSE_DONE, SSE_HEADERS, sse_data
+from routes.sync_routes import require_admin
+from services.chat_service import get_chat_response, stream_chat_response
+from services.chat_sessions import new_session_id, valid_session_id
+from services.kb_cache import get_kb_cache
 
 chat_bp = Blueprint("chat", __name__)
 
@@ -12,52 +18,65 @@ def send_message():
     {
         "message": "string - user's message",
         "puuid": "string (optional) - player's puuid for context",
+        "session_id": "string (optional) - continue this conversation (a new one is started when omitted)",
         "stream": "boolean (optional) - enable streaming (default: true)"
     }
 
-    Response: Server-Sent Events (SSE) stream with chunks of the response
+    Response: Server-Sent Events (SSE) stream. The first message is an
+    "event: session" message with the session id as JSON; text chunks are
+    sent as plain "data:" messages as the model produces them; tool progress
+    is sent as "event: tool" messages with a JSON payload; the stream ends
+    with [DONE]. Non-streaming responses carry "session_id" in the body.
     """
     data = request.json
     message = data.get("message", "").strip()
     puuid = data.get("puuid")
+    session_id = data.get("session_id") or new_session_id()
     stream = data.get("stream", True)
 
     if not message:
         return jsonify({"success": False, "error": "Message is required"}), 400
+    if not valid_session_id(session_id):
+        return jsonify({"success": False, "error": "session_id must be a string of at most 128 characters"}), 400
 
+    # Passed on explicitly: the agent runs on other threads, outside this request's context
+    app = current_app._get_current_object()
     try:
         if stream:
             # Return streaming response
             return Response(
-                stream_response(message, puuid),
+                stream_response(message, puuid, app, session_id),
                 mimetype="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "X-Accel-Buffering": "no",
-                },
+                headers=SSE_HEADERS,
             )
         else:
             # Return full response at once
-            response = get_chat_response(message, puuid)
-            return jsonify({"success": True, "response": response})
+            response = get_chat_response(message, puuid, app, session_id)
+            return jsonify({"success": True, "response": response, "session_id": session_id})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-def stream_response(message: str, puuid: str = None):
+@chat_bp.route("/kb-cache", methods=["GET"])
+@require_admin
+def kb_cache_metrics():
+    """Hit/miss metrics of the knowledge-base response cache."""
+    return jsonify(get_kb_cache().metrics())
+
+
+def stream_response(message: str, puuid: str = None, app=None, session_id: str = None):
     """
-    Stream the chat response word by word as Server-Sent Events.
+    Forward the agent's tokens and tool-call progress as Server-Sent Events as they arrive.
     """
+    yield sse_data(json.dumps({"type": "session", "session_id": session_id}), event="session")
     try:
-        response_text = get_chat_response(message, puuid)
-
-        # Stream the response word by word
-        words = response_text.split()
-        for i, word in enumerate(words):
-            chunk = word + (" " if i < len(words) - 1 else "")
-            yield f"data: {chunk}\n\n"
+        for event in stream_chat_response(message, puuid, app, session_id):
+            if event["type"] == "text":
+                yield sse_data(event["data"])
+            else:
+                yield sse_data(json.dumps(event), event=event["type"])
 
         # Send completion signal
-        yield "data: [DONE]\n\n"
+        yield SSE_DONE
     except Exception as e:
         yield f"data: [ERROR] {str(e)}\n\n"
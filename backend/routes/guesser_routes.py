@@ -0,0 +1,49 @@
+from flask import Blueprint, jsonify, request
+from extensions import db
+from services import guesser_service, player_service
+
+guesser_bp = Blueprint("guesser", __name__)
+
+
+@guesser_bp.route("/questions", methods=["GET"])
+def get_questions():
+    """
+    Next batch of League Guesser questions, never repeating within a session.
+
+    Query params: session (token from the previous batch; omit to start a new
+    session), puuid (player pool; omit for the global pool when starting),
+    count (default 10, max 50). The response's `session` continues the
+    session and is null once the pool is used up; 409 means the pool was
+    rebuilt and a new session is needed.
+    """
+    count = request.args.get("count", default=10, type=int)
+    if not 1 <= count <= guesser_service.MAX_BATCH:
+        return jsonify({"error": f"count must be between 1 and {guesser_service.MAX_BATCH}"}), 400
+
+    token = request.args.get("session")
+    if not token:
+        player = None
+        puuid = request.args.get("puuid")
+        if puuid:
+            player = player_service.get_player_by_puuid(puuid)
+            if not player:
+                return jsonify({"error": "Player not found"}), 404
+        pool = guesser_service.get_pool(player)
+        if pool is None:
+            # Players synced before the guesser existed get their pool on first use
+            pool = guesser_service.build_pool(player)
+            db.session.commit()
+        token = guesser_service.start_session(pool)
+
+    try:
+        batch = guesser_service.next_questions(token, count)
+    except guesser_service.StaleSession as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    return jsonify({
+        "session": batch["next_token"],
+        "served": batch["served"],
+        "remaining": batch["remaining"],
+        "questions": batch["questions"],
+    })
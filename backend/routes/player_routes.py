@@ -1,24 +1,227 @@
+import hashlib
+from datetime import datetime, timedelta
 
-from services.match_service import update_player_matches
-from flask import Blueprint, request, jsonify
-from services import player_service
-from services.riot_api import get_puuid
+from flask import Blueprint, current_app, redirect, request, jsonify, url_for
+from services import (
+    calendar_service, history_service, job_service, mastery_service, player_service, rewind_service, stats_service,
+    timeline_service,
+)
+from services.response_cache import cached_player_view
 
 player_bp = Blueprint("players", __name__)
 
+def _directory_response(prefix):
+    limit = request.args.get("limit", default=player_service.DIRECTORY_LIMIT, type=int)
+    if not 1 <= limit <= player_service.MAX_DIRECTORY_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {player_service.MAX_DIRECTORY_LIMIT}"}), 400
+    cursor = request.args.get("cursor")
+
+    # Repeated polling of an unchanged directory costs one aggregate query and a 304
+    version = player_service.directory_version(prefix)
+    etag = hashlib.sha1(f"{version}|{prefix}|{cursor}|{limit}".encode()).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    try:
+        page = player_service.list_players_page(cursor=cursor, limit=limit, prefix=prefix)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    response = jsonify(page)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @player_bp.route("", methods=["GET"])
 def get_all_players():
-    players = player_service.list_players()
-    return jsonify([player.to_dict() for player in players])
+    """Player directory ordered by Riot ID, one page at a time (?cursor=, ?limit= default 50)."""
+    return _directory_response(prefix=None)
+
+@player_bp.route("/search", methods=["GET"])
+def search_players():
+    """Case-insensitive prefix search on "game_name#tag_line" (?q=, plus cursor / limit)."""
+    game_name, sep, tag_line = request.args.get("q", "").partition("#")
+    prefix = player_service.normalize_riot_id(game_name, tag_line)
+    if not prefix:
+        return jsonify({"error": "q is required"}), 400
+    if not sep:
+        prefix = prefix[:-1]  # a bare game name matches every tag line
+    return _directory_response(prefix=prefix)
 
 # Example route: get a player by puuid
 @player_bp.route("/<puuid>", methods=["GET"])
+@cached_player_view
 def get_player(puuid):
     player = player_service.get_player_by_puuid(puuid)
     if not player:
         return jsonify({"error": "Player not found"}), 404
     return jsonify(player.to_dict())
 
+@player_bp.route("/<puuid>/stats", methods=["GET"])
+@cached_player_view
+def get_player_stats(puuid):
+    """
+    Aggregated stats from the player_stats rollup.
+
+    Query params: champion, role, queue (id), from / to ("YYYY-MM"),
+    group_by (champion | role | queue | month, default champion).
+    """
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    group_by = request.args.get("group_by", "champion")
+    if group_by not in stats_service.GROUP_COLUMNS:
+        return jsonify({"error": f"group_by must be one of {', '.join(stats_service.GROUP_COLUMNS)}"}), 400
+    stats = stats_service.get_player_stats(
+        player.id,
+        champion=request.args.get("champion"),
+        role=request.args.get("role"),
+        queue_id=request.args.get("queue", type=int),
+        month_from=request.args.get("from"),
+        month_to=request.args.get("to"),
+        group_by=group_by,
+    )
+    return jsonify({"puuid": puuid, **stats})
+
+@player_bp.route("/<puuid>/matches", methods=["GET"])
+@cached_player_view
+def get_player_matches(puuid):
+    """
+    Match history, newest first, one page at a time.
+
+    Query params: cursor (next_cursor of the previous page), limit (default 20, max 100),
+    queue (id), champion, role, win (true | false), from / to ("YYYY-MM-DD", inclusive).
+    """
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    limit = request.args.get("limit", default=history_service.DEFAULT_LIMIT, type=int)
+    if not 1 <= limit <= history_service.MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {history_service.MAX_LIMIT}"}), 400
+    win = request.args.get("win")
+    if win not in (None, "true", "false"):
+        return jsonify({"error": "win must be true or false"}), 400
+    try:
+        date_from = datetime.fromisoformat(request.args["from"]) if "from" in request.args else None
+        date_to = datetime.fromisoformat(request.args["to"]) + timedelta(days=1) if "to" in request.args else None
+        page = history_service.get_match_history(
+            player.id,
+            cursor=request.args.get("cursor"),
+            limit=limit,
+            queue_id=request.args.get("queue", type=int),
+            champion=request.args.get("champion"),
+            role=request.args.get("role"),
+            win=None if win is None else win == "true",
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    return jsonify({"puuid": puuid, **page})
+
+@player_bp.route("/<puuid>/rewind", methods=["GET"])
+@cached_player_view
+def get_player_rewind(puuid):
+    """Year-in-review report, served from a snapshot until the next sync (?year=2025)."""
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    year = request.args.get("year", default=2025, type=int)
+    report, cached = rewind_service.get_rewind(player, year)
+    return jsonify({"puuid": puuid, "cached": cached, **report})
+
+@player_bp.route("/<puuid>/heatmap", methods=["GET"])
+@cached_player_view
+def get_player_heatmap(puuid):
+    """
+    Binned map positions of the player's deaths (or kills / assists).
+
+    Query params: champion, side (blue | red), kind (deaths | kills | assists), bins (default 64).
+    """
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    kind = request.args.get("kind", "deaths")
+    side = request.args.get("side")
+    bins = request.args.get("bins", default=64, type=int)
+    if kind not in timeline_service.KINDS:
+        return jsonify({"error": f"kind must be one of {', '.join(timeline_service.KINDS)}"}), 400
+    if side and side not in timeline_service.SIDES:
+        return jsonify({"error": "side must be blue or red"}), 400
+    if not 1 <= bins <= timeline_service.MAX_BINS:
+        return jsonify({"error": f"bins must be between 1 and {timeline_service.MAX_BINS}"}), 400
+    heatmap = timeline_service.get_heatmap(
+        player, champion=request.args.get("champion"), side=side, kind=kind, bins=bins
+    )
+    return jsonify({"puuid": puuid, **heatmap})
+
+@player_bp.route("/<puuid>/calendar", methods=["GET"])
+def get_player_calendar(puuid):
+    """
+    Per-day games, wins and KDA of one month, days in the player's timezone.
+
+    Query params: year, month (default: the current month in the player's timezone).
+    """
+    if "year" in request.args and "month" in request.args:
+        return _player_calendar(puuid)
+    # Redirect to the explicit month: the cached response must not depend on the date it was made
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    today = datetime.now(calendar_service.get_zone(player.timezone))
+    year = request.args.get("year", default=today.year, type=int)
+    month = request.args.get("month", default=today.month, type=int)
+    return redirect(url_for(".get_player_calendar", puuid=puuid, year=year, month=month))
+
+@cached_player_view
+def _player_calendar(puuid):
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    year = request.args.get("year", type=int)
+    month = request.args.get("month", type=int)
+    if year is None or month is None:
+        return jsonify({"error": "year and month must be integers"}), 400
+    try:
+        month_view = calendar_service.get_calendar(player, year, month)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    return jsonify({"puuid": puuid, **month_view})
+
+@player_bp.route("/<puuid>/mastery", methods=["GET"])
+@cached_player_view
+def get_player_mastery(puuid):
+    """
+    Champion mastery, highest points first (refreshed by syncs).
+
+    Query params: limit; champion (id) adds that champion's progression history.
+    """
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    payload = {"puuid": puuid, **mastery_service.get_mastery(player, limit=limit)}
+    champion_id = request.args.get("champion", type=int)
+    if champion_id is not None:
+        payload["history"] = mastery_service.get_mastery_history(player, champion_id)
+    return jsonify(payload)
+
+@player_bp.route("/<puuid>/timezone", methods=["PUT"])
+def set_player_timezone(puuid):
+    """Set the IANA timezone calendar days are bucketed in ({"timezone": "Europe/Berlin"})."""
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    data = request.get_json(silent=True) or {}
+    try:
+        calendar_service.set_player_timezone(player, data.get("timezone") or "")
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    return jsonify(player.to_dict())
+
 @player_bp.route("/puuid", methods=["POST"])
 def fetch_puuid():
     data = request.json
@@ -28,7 +231,7 @@ def fetch_puuid():
     if not game_name or not tag_line or not region:
         return jsonify({"error": "Both game_name and tag_line are required"}), 400
     try:
-        puuid = get_puuid(game_name, tag_line, region)
+        puuid = player_service.resolve_puuid(game_name, tag_line, region)
         if not puuid:
             return jsonify({"error": "Failed to fetch PUUID"}), 400
         return jsonify({"puuid": puuid})
@@ -39,7 +242,10 @@ def fetch_puuid():
 @player_bp.route("", methods=["POST"])
 def create_player():
     data = request.json
-    new_player = player_service.create_player(data)
+    try:
+        new_player = player_service.create_player(data)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     if not new_player:
         return jsonify({"error": "Failed to create player"}), 400
     return jsonify(new_player.to_dict()), 201
@@ -47,5 +253,11 @@ def create_player():
 
 @player_bp.route("/<puuid>/sync", methods=["POST"])
 def sync_player(puuid):
-    out = update_player_matches(puuid, current_year=2025)
-    return jsonify(out)
+    """Queue a match sync and return its job right away; poll GET /api/v1/sync/<job_id>."""
+    player = player_service.get_player_by_puuid(puuid)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    data = request.get_json(silent=True) or {}
+    job = job_service.enqueue_sync(puuid, region=data.get("region", player.region))
+    job_service.start_sync_workers(current_app._get_current_object())
+    return jsonify({"job_id": job.id, **job.to_dict()}), 202, {"Location": f"/api/v1/sync/{job.id}"}
@@ -0,0 +1,15 @@
+"""Server-Sent Events framing shared by the WSGI blueprints and the ASGI stream handlers."""
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+SSE_DONE = "data: [DONE]\n\n"
+
+
+def sse_data(text: str, event: str = None) -> str:
+    # Every line of a multi-line payload needs its own "data:" field
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in text.split("\n")]
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,103 @@
+import hmac
+import json
+import time
+from functools import wraps
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from extensions import db
+from routes.sse import SSE_DONE, SSE_HEADERS, sse_data
+from services import bulk_sync_service, job_service
+from services.riot_api import ROUTING_REGIONS
+
+sync_bp = Blueprint("sync", __name__)
+
+POLL_INTERVAL_SEC = 1
+
+
+def require_admin(view):
+    """Allow the request only with an X-Admin-Token header matching ADMIN_TOKEN."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get("ADMIN_TOKEN")
+        if not expected:
+            return jsonify({"error": "Admin endpoints are disabled (ADMIN_TOKEN is not set)"}), 403
+        if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), expected):
+            return jsonify({"error": "Invalid admin token"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@sync_bp.route("/<int:job_id>", methods=["GET"])
+def get_sync_job(job_id):
+    job = job_service.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Sync job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@sync_bp.route("/<int:job_id>/events", methods=["GET"])
+def stream_sync_job(job_id):
+    """
+    Server-Sent Events stream of a sync job's progress.
+
+    Emits the job as JSON whenever its status or processed count changes and
+    closes after the job is done or failed.
+    """
+    if not job_service.get_job(job_id):
+        return jsonify({"error": "Sync job not found"}), 404
+
+    def events():
+        last = None
+        while True:
+            db.session.expire_all()
+            job = job_service.get_job(job_id)
+            state = (job.status, job.processed_count)
+            if state != last:
+                yield sse_data(json.dumps(job.to_dict()))
+                last = state
+            if job.status not in job_service.ACTIVE_STATUSES:
+                yield SSE_DONE
+                return
+            db.session.rollback()  # release the read transaction between polls
+            time.sleep(POLL_INTERVAL_SEC)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@sync_bp.route("/runs", methods=["POST"])
+@require_admin
+def start_sync_run():
+    """
+    Sync every tracked player (or a filtered set) in the background; poll GET /api/v1/sync/runs/<run_id>.
+
+    JSON body (all optional): puuids, regions, year, resume (true = continue the last unfinished run).
+    """
+    data = request.get_json(silent=True) or {}
+    regions = data.get("regions")
+    if regions and not set(regions) <= set(ROUTING_REGIONS):
+        return jsonify({"error": f"regions must be among {', '.join(ROUTING_REGIONS)}"}), 400
+
+    active = bulk_sync_service.get_active_run()
+    if active:
+        return jsonify({"error": "A sync run is already in progress", "run_id": active.id}), 409
+
+    run = bulk_sync_service.get_resumable_run() if data.get("resume") else None
+    if run is None:
+        run = bulk_sync_service.create_run(
+            puuids=data.get("puuids"), regions=regions, year=data.get("year", 2025)
+        )
+    bulk_sync_service.start_run_in_background(run.id)
+    return jsonify(bulk_sync_service.run_progress(run)), 202, {"Location": f"/api/v1/sync/runs/{run.id}"}
+
+
+@sync_bp.route("/runs/<int:run_id>", methods=["GET"])
+@require_admin
+def get_sync_run(run_id):
+    run = bulk_sync_service.get_run(run_id)
+    if not run:
+        return jsonify({"error": "Sync run not found"}), 404
+    return jsonify(bulk_sync_service.run_progress(run))
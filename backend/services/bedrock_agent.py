@@ -4,10 +4,19 @@ Uses S3-backed Knowledge Base (same approach as league_analytics_agent.py).
 """
 import os
 import json
+import asyncio
+import logging
+import queue
+import threading
 from dotenv import load_dotenv
 
+from services.chat_sessions import get_session_store
+from services.kb_cache import get_kb_cache
+from services.player_context import get_player_context, query_player_stats
+
 try:
-    from strands import Agent, tool
+    from strands import Agent, ToolContext, tool
+    from strands.agent.conversation_manager import SlidingWindowConversationManager
     from strands.models import BedrockModel
     import boto3
 except ImportError:
@@ -19,24 +28,62 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration from .env
 REGION = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
 KNOWLEDGE_BASE_ID = os.getenv("KNOWLEDGE_BASE_ID", "229CDNHRIX")
 MODEL_ARN = os.getenv("MODEL_ARN", "arn:aws:bedrock:us-east-1::foundation-model/anthropic.claude-3-haiku-20240307-v1:0")
 AGENT_MODEL_ID = os.getenv("AGENT_MODEL_ID", "us.anthropic.claude-sonnet-4-20250514-v1:0")
+# Messages of a chat session's history sent with every turn
+CHAT_HISTORY_MESSAGES = int(os.getenv("CHAT_HISTORY_MESSAGES", 20))
+# "bedrock" (default) or "fake" for the offline model in services/fake_model.py
+CHAT_MODEL_BACKEND = os.getenv("CHAT_MODEL_BACKEND", "bedrock")
 
 # Initialize Bedrock clients
 bedrock_runtime = boto3.client("bedrock-agent-runtime", region_name=REGION)
 
-bedrock_model = BedrockModel(
-    model_id=AGENT_MODEL_ID,
-    region_name=REGION,
-)
+if CHAT_MODEL_BACKEND == "fake":
+    from services.fake_model import FakeStreamingModel
+
+    bedrock_model = FakeStreamingModel(
+        token_delay_ms=int(os.getenv("FAKE_MODEL_TOKEN_DELAY_MS", 20)),
+        tool_name=os.getenv("FAKE_MODEL_TOOL") or None,
+    )
+else:
+    bedrock_model = BedrockModel(
+        model_id=AGENT_MODEL_ID,
+        region_name=REGION,
+    )
 
 # =====================================================================
 # KNOWLEDGE BASE QUERY TOOL (similar to chatbot example)
 # =====================================================================
 
+def _retrieve_and_generate(query: str, max_results: int) -> str:
+    resp = bedrock_runtime.retrieve_and_generate(
+        input={"text": query},
+        retrieveAndGenerateConfiguration={
+            "type": "KNOWLEDGE_BASE",
+            "knowledgeBaseConfiguration": {
+                "knowledgeBaseId": KNOWLEDGE_BASE_ID,
+                "modelArn": MODEL_ARN,
+                "retrievalConfiguration": {
+                    "vectorSearchConfiguration": {
+                        "numberOfResults": max_results
+                    }
+                }
+            }
+        }
+    )
+
+    answer = resp.get("output", {}).get("text", "")
+    citations = resp.get("citations", [])
+    num_sources = len(citations)
+
+    return f"{answer}\n\nSources used: {num_sources}"
+
+
 @tool
 def query_match_data(query: str, max_results: int = 5) -> str:
     """
@@ -48,28 +95,12 @@ def query_match_data(query: str, max_results: int = 5) -> str:
         return "RAG model ARN is not configured. Please set MODEL_ARN in the .env file."
 
     try:
-        resp = bedrock_runtime.retrieve_and_generate(
-            input={"text": query},
-            retrieveAndGenerateConfiguration={
-                "type": "KNOWLEDGE_BASE",
-                "knowledgeBaseConfiguration": {
-                    "knowledgeBaseId": KNOWLEDGE_BASE_ID,
-                    "modelArn": MODEL_ARN,
-                    "retrievalConfiguration": {
-                        "vectorSearchConfiguration": {
-                            "numberOfResults": max_results
-                        }
-                    }
-                }
-            }
+        # Near-identical tool queries from different users share one knowledge-base call
+        return get_kb_cache().get_or_compute(
+            query,
+            lambda: _retrieve_and_generate(query, max_results),
+            max_results=max_results,
         )
-
-        answer = resp.get("output", {}).get("text", "")
-        citations = resp.get("citations", [])
-        num_sources = len(citations)
-
-        return f"{answer}\n\nSources used: {num_sources}"
-
     except Exception as e:
         return f"Error querying knowledge base: {e}"
 
@@ -115,45 +146,122 @@ def compare_champions(champion1: str, champion2: str) -> str:
     return query_match_data(q, max_results=12)
 
 
+# =====================================================================
+# LOCAL PLAYER STATS TOOL (our own database, no knowledge-base round trip)
+# =====================================================================
+
+@tool(context=True)
+def get_player_stats(champion: str = None, role: str = None, queue_id: int = None, month_from: str = None,
+                     month_to: str = None, group_by: str = "champion", puuid: str = None,
+                     tool_context: ToolContext = None) -> str:
+    """
+    Stats of a player's own games from our match database: totals plus a breakdown by
+    group_by (champion, role, queue or month), optionally filtered by champion name,
+    role, queue_id (e.g. 420 for ranked solo) and month range ("YYYY-MM").
+    Fast - prefer it to the knowledge base for questions about the player's games.
+    puuid defaults to the player of the conversation.
+    """
+    state = tool_context.invocation_state
+    puuid = puuid or state.get("puuid")
+    app = state.get("flask_app")
+    if not puuid:
+        return "No player is attached to this conversation."
+    if app is None:
+        return "The match database is not available here; use analyze_player_performance instead."
+    with app.app_context():
+        return query_player_stats(puuid, champion=champion, role=role, queue_id=queue_id,
+                                  month_from=month_from, month_to=month_to, group_by=group_by)
+
+
 # =====================================================================
 # AGENT DEFINITION
 # =====================================================================
 
-agent = Agent(
-    model=bedrock_model,
-    system_prompt=(
-        "You are a League of Legends analytics expert. "
-        "When users ask for specific, data-backed information about players, champions, or meta, "
-        "use the available tools to query the knowledge base. "
-        "Provide detailed analysis based on the retrieved data. "
-        "If the knowledge base doesn't have the requested information, be transparent about it."
-    ),
-    tools=[
-        query_match_data,
-        analyze_player_performance,
-        analyze_meta_trends,
-        compare_champions,
-    ],
+SYSTEM_PROMPT = (
+    "You are a League of Legends analytics expert. "
+    "When the conversation is about a player, a summary of their games from our match database "
+    "follows; answer from it when it covers the question, and use get_player_stats for other "
+    "breakdowns of the player's own games. "
+    "When users ask for specific, data-backed information about players, champions, or meta, "
+    "use the available tools to query the knowledge base. "
+    "Provide detailed analysis based on the retrieved data. "
+    "If the knowledge base doesn't have the requested information, be transparent about it."
 )
 
+TOOLS = [
+    get_player_stats,
+    query_match_data,
+    analyze_player_performance,
+    analyze_meta_trends,
+    compare_champions,
+]
+
+
+def create_agent(messages=None, system_prompt=SYSTEM_PROMPT):
+    """
+    New agent sharing the process-wide model client, continuing `messages`.
+
+    A Strands agent serves one invocation at a time (a second concurrent call
+    raises ConcurrencyException), so every chat request gets its own; the
+    conversation lives in the session store instead (services/chat_sessions.py)
+    and is cut to the last CHAT_HISTORY_MESSAGES messages after every turn.
+    """
+    return Agent(
+        model=bedrock_model,
+        system_prompt=system_prompt,
+        tools=TOOLS,
+        messages=messages,
+        # Events are consumed through stream_async; the default handler would print every token to stdout
+        callback_handler=None,
+        conversation_manager=SlidingWindowConversationManager(window_size=CHAT_HISTORY_MESSAGES),
+    )
+
+
+def _system_prompt(puuid, app):
+    """SYSTEM_PROMPT plus the player's puuid and, when their games are stored, their summary."""
+    if not puuid:
+        return SYSTEM_PROMPT
+    context = None
+    if app is not None:
+        try:
+            with app.app_context():
+                context = get_player_context(puuid)
+        except Exception:  # the agent can still answer from the knowledge base
+            logger.exception("Player context for %s not available", puuid)
+    prompt = f"{SYSTEM_PROMPT}\n\nThe user is the player with PUUID {puuid}."
+    if context:
+        # In the system prompt rather than the message, so it is not repeated through the history
+        prompt += f"\n\nPlayer summary from our match database:\n{context}"
+    return prompt
+
+
+def _session_agent(session_id, puuid, app):
+    messages = get_session_store().load(session_id) if session_id else None
+    return create_agent(messages=messages, system_prompt=_system_prompt(puuid, app))
+
 
-def get_agent_response(message: str, puuid: str = None) -> str:
+def _save_session(session_id, agent):
+    if session_id:
+        get_session_store().save(session_id, agent.messages)
+
+
+def get_agent_response(message: str, puuid: str = None, app=None, session_id: str = None) -> str:
     """
     Get a response from the Bedrock agent using Knowledge Base.
 
     Args:
         message: User's message
-        puuid: Optional player PUUID for context (can be included in the message)
+        puuid: Optional player PUUID for context (added to the system prompt)
+        app: Flask app whose database backs the player summary and get_player_stats
+        session_id: Optional chat session whose history the turn continues and extends
 
     Returns:
         Agent's response
     """
     try:
-        # If puuid is provided, add it as context to the message
-        if puuid:
-            message = f"[Player PUUID: {puuid}] {message}"
-
-        response = agent(message)
+        agent = _session_agent(session_id, puuid, app)
+        response = agent(message, invocation_state={"puuid": puuid, "flask_app": app})
+        _save_session(session_id, agent)
 
         # Ensure response is a string
         if not isinstance(response, str):
@@ -163,3 +271,79 @@ def get_agent_response(message: str, puuid: str = None) -> str:
 
     except Exception as e:
         raise Exception(f"Error getting agent response: {str(e)}")
+
+
+def _tool_results(message):
+    return [block["toolResult"] for block in message.get("content", []) if "toolResult" in block]
+
+
+async def stream_agent_events(message: str, puuid: str = None, app=None, session_id: str = None):
+    """
+    Stream the agent's answer as it is generated.
+
+    Yields dicts of two kinds:
+        {"type": "text", "data": "<token(s)>"}
+        {"type": "tool", "name": "<tool>", "tool_use_id": "...", "status": "started" | "success" | "error"}
+    """
+    agent = await asyncio.to_thread(_session_agent, session_id, puuid, app)
+
+    tools_started = {}
+    async for event in agent.stream_async(message, invocation_state={"puuid": puuid, "flask_app": app}):
+        if "data" in event:
+            yield {"type": "text", "data": event["data"]}
+        elif "current_tool_use" in event:
+            tool_use = event["current_tool_use"]
+            tool_use_id = tool_use.get("toolUseId")
+            if tool_use_id and tool_use_id not in tools_started:
+                tools_started[tool_use_id] = tool_use.get("name")
+                yield {"type": "tool", "name": tool_use.get("name"), "tool_use_id": tool_use_id, "status": "started"}
+        elif "message" in event:
+            for result in _tool_results(event["message"]):
+                tool_use_id = result.get("toolUseId")
+                yield {
+                    "type": "tool",
+                    "name": tools_started.get(tool_use_id),
+                    "tool_use_id": tool_use_id,
+                    "status": result.get("status", "success"),
+                }
+    await asyncio.to_thread(_save_session, session_id, agent)
+
+
+_STREAM_END = object()
+
+
+def iter_agent_events(message: str, puuid: str = None, app=None, session_id: str = None):
+    """
+    Synchronous view of `stream_agent_events` for WSGI responses.
+
+    The agent's event loop runs on a helper thread and events are handed over
+    through a queue as soon as they are produced. Closing this generator (e.g.
+    the SSE client went away) stops the agent at its next event.
+    """
+    events = queue.Queue()
+    cancelled = threading.Event()
+
+    async def pump():
+        stream = stream_agent_events(message, puuid, app, session_id)
+        try:
+            async for event in stream:
+                if cancelled.is_set():
+                    break
+                events.put(event)
+        except Exception as e:
+            events.put(e)
+        finally:
+            await stream.aclose()  # also closes the agent's model stream when we stopped early
+            events.put(_STREAM_END)
+
+    threading.Thread(target=lambda: asyncio.run(pump()), daemon=True).start()
+    try:
+        while True:
+            item = events.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise Exception(f"Error getting agent response: {str(item)}")
+            yield item
+    finally:
+        cancelled.set()
@@ -0,0 +1,213 @@
+"""
+Bulk sync of many players (`flask sync-all`, POST /api/v1/sync/runs).
+
+A `SyncRun` snapshots the selected players (by default every tracked one,
+i.e. added through the API rather than only seen as a co-participant) into
+`SyncRunItem` rows ordered by oldest `last_updated` first. Each routing region has its own Riot rate-limit
+bucket, so the run drains one thread per region in parallel; a thread takes
+the next `SYNC_ALL_BATCH` pending items of its region, syncs them together
+with `sync_players` (shared games fetched once) and marks them done in the
+same commit. An interrupted run therefore resumes from its pending items and
+repeats at most one batch per region.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from extensions import db
+from models.schema import Player, SyncRun, SyncRunItem
+from services.guesser_service import build_pool, build_pools
+from services.mastery_service import sync_mastery
+from services.match_service import sync_players, update_player_matches
+
+
+def create_run(puuids=None, regions=None, year=2025):
+    """Snapshot the players to sync (all tracked ones, or the given puuids; optionally by region) into a new run."""
+    query = Player.query
+    if puuids:
+        query = query.filter(Player.puuid.in_(puuids))
+    else:
+        # Co-participants stored by ingestion are players too, but nobody asked to follow them
+        query = query.filter(Player.tracked.is_(True))
+    if regions:
+        query = query.filter(Player.region.in_(regions))
+    players = query.order_by(Player.last_updated.asc().nullsfirst(), Player.id).all()
+
+    run = SyncRun(status="running", filters={"puuids": puuids, "regions": regions}, year=year,
+                  heartbeat_at=datetime.utcnow())
+    db.session.add(run)
+    db.session.flush()
+    db.session.add_all([
+        SyncRunItem(run_id=run.id, puuid=p.puuid, region=p.region, priority=i, status="pending")
+        for i, p in enumerate(players)
+    ])
+    db.session.commit()
+    return run
+
+
+def get_run(run_id):
+    return db.session.get(SyncRun, run_id)
+
+
+def get_active_run():
+    """The running run whose heartbeat is fresh, i.e. one that some process is still draining."""
+    fresh_after = datetime.utcnow() - timedelta(seconds=current_app.config["SYNC_JOB_STALE_SEC"])
+    return (
+        SyncRun.query.filter(SyncRun.status == "running", SyncRun.heartbeat_at >= fresh_after)
+        .order_by(SyncRun.id.desc()).first()
+    )
+
+
+def get_resumable_run():
+    """The latest run that stopped before finishing."""
+    return SyncRun.query.filter(SyncRun.status == "running").order_by(SyncRun.id.desc()).first()
+
+
+def run_progress(run):
+    """Item counts of a run per region and status."""
+    rows = (
+        db.session.query(SyncRunItem.region, SyncRunItem.status, func.count())
+        .filter(SyncRunItem.run_id == run.id)
+        .group_by(SyncRunItem.region, SyncRunItem.status)
+        .all()
+    )
+    regions = {}
+    totals = {"pending": 0, "done": 0, "failed": 0}
+    for region, status, count in rows:
+        regions.setdefault(region, {"pending": 0, "done": 0, "failed": 0})[status] = count
+        totals[status] += count
+    return {**run.to_dict(), "totals": totals, "regions": regions}
+
+
+def _refresh_derived(run, items):
+    """Refresh the batch's champion mastery and guesser pools; a failure here never fails the synced items."""
+    puuids = [i.puuid for i in items]
+    if current_app.config["SYNC_MASTERY"]:
+        try:
+            sync_mastery(puuids)
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Sync run %s: mastery refresh failed", run.id)
+    try:
+        build_pools(puuids)
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Sync run %s: guesser pool rebuild failed", run.id)
+
+
+def _sync_batch(run, items, region):
+    """Sync one batch and record its items; falls back to one player at a time to isolate a failure."""
+    def heartbeat(_processed_count):
+        # Committed with the sync's own batches, so a long batch never looks abandoned
+        run.heartbeat_at = datetime.utcnow()
+
+    try:
+        out = sync_players([i.puuid for i in items], current_year=run.year, region=region, progress=heartbeat)
+        for item in items:
+            item.status = "done"
+            item.processed_count = out["listed_per_player"].get(item.puuid, 0)
+            item.finished_at = datetime.utcnow()
+        run.heartbeat_at = datetime.utcnow()
+        db.session.commit()  # checkpoint before the refreshes, whose rollback on failure must not undo it
+        _refresh_derived(run, items)
+        return
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Sync run %s: batch in %s failed, retrying players one by one", run.id, region)
+
+    for item in items:
+        try:
+            out = update_player_matches(item.puuid, current_year=run.year, region=region, progress=heartbeat)
+            item.status = "done"
+            item.processed_count = out["processed_count"]
+        except Exception as e:
+            db.session.rollback()
+            item.status = "failed"
+            item.error = str(e)
+        item.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+def _drain_region(run_id, region, batch_size, on_batch=None):
+    run = get_run(run_id)
+    while True:
+        items = (
+            SyncRunItem.query
+            .filter_by(run_id=run_id, region=region, status="pending")
+            .order_by(SyncRunItem.priority)
+            .limit(batch_size)
+            .all()
+        )
+        if not items:
+            return
+        _sync_batch(run, items, region)
+        run.heartbeat_at = datetime.utcnow()
+        db.session.commit()  # heartbeat after the batch and its derived refreshes
+        if on_batch:
+            on_batch(region, items)
+
+
+def execute_run(run_id, batch_size=None, on_batch=None):
+    """
+    Drain a run's pending items, one thread per routing region, and mark it done.
+
+    `on_batch(region, items)` is called from the region thread after each checkpoint.
+    """
+    app = current_app._get_current_object()
+    batch_size = batch_size or app.config["SYNC_ALL_BATCH"]
+    run = get_run(run_id)
+    run.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    regions = [r for (r,) in (
+        db.session.query(SyncRunItem.region)
+        .filter_by(run_id=run_id, status="pending")
+        .distinct()
+    )]
+    errors = []
+
+    def worker(region):
+        with app.app_context():
+            try:
+                _drain_region(run_id, region, batch_size, on_batch)
+            except Exception as e:
+                app.logger.exception("Sync run %s: region %s stopped", run_id, region)
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(r,), name=f"sync-run-{run_id}-{r}") for r in regions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    db.session.expire_all()
+    run = get_run(run_id)
+    if not errors:
+        # A region thread that died leaves the run "running" so it can be resumed
+        run.status = "done"
+        run.finished_at = datetime.utcnow()
+    db.session.commit()
+    if not errors:
+        # After the run's outcome is committed, like the per-batch refreshes
+        try:
+            build_pool(None)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Sync run %s: global guesser pool rebuild failed", run_id)
+    return run
+
+
+def start_run_in_background(run_id):
+    """Drain a run on a daemon thread (used by the admin endpoint)."""
+    app = current_app._get_current_object()
+
+    def target():
+        with app.app_context():
+            execute_run(run_id)
+
+    t = threading.Thread(target=target, name=f"sync-run-{run_id}", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,176 @@
+"""
+Per-day activity index behind the calendar view, served from `player_daily_activity`.
+
+`ingest_matches` calls `record_daily_activity` with the participant rows it has
+just inserted; each game is bucketed on the calendar day of its start in the
+player's timezone (`Player.timezone`) and folded in with an additive
+ON CONFLICT upsert that also appends the Riot match id to the day's list. A
+month of the calendar is then one range read on (player_id, day).
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select, update
+
+from extensions import db
+from models.schema import Match, Participant, Player, PlayerDailyActivity
+from services.db_utils import chunked, upsert_insert
+
+SUM_COLUMNS = ("games", "wins", "kills", "deaths", "assists")
+UPSERT_CHUNK = 500
+
+
+def get_zone(name):
+    """ZoneInfo for an IANA timezone name; raises ValueError for unknown names."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone {name!r}") from e
+
+
+def _local_day(timestamp, zone):
+    # Match timestamps are naive server-local time (datetime.fromtimestamp), which astimezone() assumes
+    return timestamp.astimezone(zone).date()
+
+
+def _rollup(participant_rows, match_meta, zones, deltas=None):
+    """Aggregate participant rows into per-(player, day) deltas; `zones` maps player_id -> ZoneInfo."""
+    deltas = {} if deltas is None else deltas
+    for p in participant_rows:
+        riot_match_id, timestamp = match_meta[p["match_id"]]
+        key = (p["player_id"], _local_day(timestamp, zones[p["player_id"]]))
+        d = deltas.get(key)
+        if d is None:
+            d = deltas[key] = {**dict.fromkeys(SUM_COLUMNS, 0), "match_ids": []}
+        d["games"] += 1
+        d["wins"] += 1 if p["win"] else 0
+        d["kills"] += p["kills"] or 0
+        d["deaths"] += p["deaths"] or 0
+        d["assists"] += p["assists"] or 0
+        d["match_ids"].append(riot_match_id)
+    return deltas
+
+
+def _apply(deltas):
+    rows = [
+        {"player_id": k[0], "day": k[1], **d, "match_ids": ",".join(d["match_ids"])}
+        for k, d in deltas.items()
+    ]
+    for chunk in chunked(rows, UPSERT_CHUNK):
+        stmt = upsert_insert(PlayerDailyActivity).values(chunk)
+        set_ = {c: getattr(PlayerDailyActivity, c) + getattr(stmt.excluded, c) for c in SUM_COLUMNS}
+        set_["match_ids"] = PlayerDailyActivity.match_ids + "," + stmt.excluded.match_ids
+        stmt = stmt.on_conflict_do_update(index_elements=["player_id", "day"], set_=set_)
+        db.session.execute(stmt)
+
+
+def _player_zones(player_ids):
+    zones = {}
+    for ids in chunked(sorted(player_ids), UPSERT_CHUNK):
+        for player_id, name in db.session.execute(
+            select(Player.id, Player.timezone).where(Player.id.in_(ids))
+        ):
+            zones[player_id] = get_zone(name)
+    return zones
+
+
+def record_daily_activity(participant_rows, match_meta):
+    """
+    Fold newly inserted participants into the daily index.
+
+    `match_meta` maps matches.id -> (Riot match id, timestamp). Callers must
+    pass each participant exactly once (i.e. only rows they actually inserted).
+    """
+    if participant_rows:
+        zones = _player_zones({p["player_id"] for p in participant_rows})
+        _apply(_rollup(participant_rows, match_meta, zones))
+
+
+def rebuild_daily_activity(player_ids=None, batch=5000):
+    """Recompute the index from `participants`, for all players or only `player_ids`."""
+    delete = PlayerDailyActivity.query
+    q = (
+        select(
+            Participant.match_id, Participant.player_id, Participant.win,
+            Participant.kills, Participant.deaths, Participant.assists,
+            Match.match_id.label("riot_match_id"), Match.timestamp,
+        )
+        .join(Match, Match.id == Participant.match_id)
+        .where(Match.timestamp.isnot(None))
+        .order_by(Match.timestamp)
+        .execution_options(yield_per=batch)
+    )
+    if player_ids is not None:
+        delete = delete.filter(PlayerDailyActivity.player_id.in_(player_ids))
+        q = q.where(Participant.player_id.in_(player_ids))
+    delete.delete(synchronize_session=False)
+
+    deltas, zones = {}, {}
+    count = 0
+    for rows in db.session.execute(q).mappings().partitions():
+        missing = {r["player_id"] for r in rows} - zones.keys()
+        if missing:
+            zones.update(_player_zones(missing))
+        _rollup(rows, {r["match_id"]: (r["riot_match_id"], r["timestamp"]) for r in rows}, zones, deltas)
+        count += len(rows)
+    _apply(deltas)
+    return count
+
+
+def set_player_timezone(player, name):
+    """Switch the player's timezone and re-bucket their calendar."""
+    get_zone(name)
+    if name == player.timezone:
+        return
+    player.timezone = name
+    db.session.flush()
+    rebuild_daily_activity([player.id])
+    # New data version, so cached calendar pages bucketed in the old timezone are not served
+    db.session.execute(update(Player).where(Player.id == player.id).values(data_changed_at=datetime.utcnow()))
+    db.session.commit()
+
+
+def get_calendar(player, year, month):
+    """One month of the player's calendar: per-day totals keyed by "YYYY-MM-DD", plus month totals."""
+    if not 1 <= month <= 12:
+        raise ValueError("month must be between 1 and 12")
+    first = date(year, month, 1)
+    after = first + timedelta(days=calendar.monthrange(year, month)[1])
+    rows = db.session.execute(
+        select(PlayerDailyActivity)
+        .where(
+            PlayerDailyActivity.player_id == player.id,
+            PlayerDailyActivity.day >= first,
+            PlayerDailyActivity.day < after,
+        )
+        .order_by(PlayerDailyActivity.day)
+    ).scalars()
+
+    days = {}
+    totals = dict.fromkeys(SUM_COLUMNS, 0)
+    for row in rows:
+        values = {c: getattr(row, c) for c in SUM_COLUMNS}
+        for c in SUM_COLUMNS:
+            totals[c] += values[c]
+        days[row.day.isoformat()] = {
+            **_summarize(values),
+            "match_ids": row.match_ids.split(",") if row.match_ids else [],
+        }
+    return {
+        "year": year,
+        "month": month,
+        "timezone": player.timezone,
+        "active_days": len(days),
+        "totals": _summarize(totals),
+        "days": days,
+    }
+
+
+def _summarize(values):
+    games = values["games"]
+    out = dict(values)
+    out["losses"] = games - values["wins"]
+    out["win_rate"] = round(values["wins"] / games, 4) if games else None
+    out["kda"] = round((values["kills"] + values["assists"]) / max(values["deaths"], 1), 2) if games else None
+    return out
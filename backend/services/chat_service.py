@@ -1,22 +1,36 @@
 """
 Chat service that integrates with the Bedrock League Analytics Agent.
 """
-from services.bedrock_agent import get_agent_response
+from services.bedrock_agent import get_agent_response, iter_agent_events
 
 
-def get_chat_response(user_message: str, puuid: str = None) -> str:
+def get_chat_response(user_message: str, puuid: str = None, app=None, session_id: str = None) -> str:
     """
     Get a response from the Bedrock League Analytics Agent.
 
     Args:
         user_message: The user's message to the agent
         puuid: Optional player PUUID for personalized context
+        app: Flask app whose database backs the player context
+        session_id: Optional chat session the message belongs to
 
     Returns:
         The agent's response as a string
     """
     try:
-        response = get_agent_response(user_message, puuid)
+        response = get_agent_response(user_message, puuid, app, session_id)
         return response
     except Exception as e:
         raise Exception(f"Error getting chat response: {str(e)}")
+
+
+def stream_chat_response(user_message: str, puuid: str = None, app=None, session_id: str = None):
+    """
+    Stream the agent's response as it is generated.
+
+    Yields text chunks and tool progress events (see bedrock_agent.stream_agent_events).
+    """
+    try:
+        yield from iter_agent_events(user_message, puuid, app, session_id)
+    except Exception as e:
+        raise Exception(f"Error getting chat response: {str(e)}")
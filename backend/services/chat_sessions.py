@@ -0,0 +1,169 @@
+"""
+Conversation history of chat sessions.
+
+Every chat request builds a fresh agent (a Strands agent serves one
+invocation at a time) seeded with its session's stored messages, and saves the
+messages back when the turn completes. The agent's sliding-window
+conversation manager keeps that history to the last CHAT_HISTORY_MESSAGES
+messages, so prompt size stays bounded however long a conversation runs.
+
+Stores evict sessions idle for longer than CHAT_SESSION_IDLE_SEC and, past
+CHAT_SESSION_MAX sessions, the least recently used ones:
+
+  * `MemorySessionStore` - per process; fine for a single worker
+  * `SQLiteSessionStore` - one file shared by all workers on the host
+
+Two concurrent turns of the same session both start from the same history and
+the later save wins. Replace the process-wide store with
+`set_session_store(...)`, e.g. a fresh `MemorySessionStore()` in tests.
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+MAX_SESSION_ID_LENGTH = 128
+EVICT_INTERVAL_SEC = 60  # the SQLite store sweeps idle sessions at most this often
+EVICT_TO_RATIO = 0.9
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def valid_session_id(session_id):
+    return isinstance(session_id, str) and 0 < len(session_id) <= MAX_SESSION_ID_LENGTH
+
+
+class MemorySessionStore:
+    def __init__(self, max_sessions=1000, idle_ttl_sec=1800):
+        self.max_sessions = max_sessions
+        self.idle_ttl_sec = idle_ttl_sec
+        self._sessions = OrderedDict()  # session_id -> (last_used, messages), least recently used first
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._sessions:
+            last_used, _ = next(iter(self._sessions.values()))
+            if now - last_used <= self.idle_ttl_sec and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def load(self, session_id):
+        """The session's messages, or None for an unknown or expired session."""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            # The agent edits its messages in place; keep the stored ones untouched
+            return copy.deepcopy(entry[1])
+
+    def save(self, session_id, messages):
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (now, copy.deepcopy(messages))
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    def __init__(self, path, max_sessions=10000, idle_ttl_sec=1800):
+        self.max_sessions = max_sessions
+        self.idle_ttl_sec = idle_ttl_sec
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " messages TEXT NOT NULL,"
+            " used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_sessions_used_at ON chat_sessions (used_at)")
+
+    def _sweep(self, now):
+        if now - self._last_sweep < EVICT_INTERVAL_SEC:
+            return
+        self._last_sweep = now
+        self._conn.execute("DELETE FROM chat_sessions WHERE used_at < ?", (now - self.idle_ttl_sec,))
+        # Other workers write to the same file, so count for real before evicting
+        count = self._conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+        if count > self.max_sessions:
+            self._conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id IN"
+                " (SELECT session_id FROM chat_sessions ORDER BY used_at LIMIT ?)",
+                (count - int(self.max_sessions * EVICT_TO_RATIO),),
+            )
+
+    def load(self, session_id):
+        """The session's messages, or None for an unknown or expired session."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT messages FROM chat_sessions WHERE session_id = ? AND used_at >= ?",
+                (session_id, now - self.idle_ttl_sec),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE chat_sessions SET used_at = ? WHERE session_id = ?", (now, session_id))
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id, messages):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, messages, used_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(messages, separators=(",", ":")), now),
+            )
+            self._sweep(now)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM chat_sessions WHERE used_at >= ?", (time.time() - self.idle_ttl_sec,)
+            ).fetchone()[0]
+
+
+def _from_env():
+    backend = os.getenv("CHAT_SESSION_BACKEND", "memory")
+    max_sessions = int(os.getenv("CHAT_SESSION_MAX", 1000))
+    idle_ttl_sec = int(os.getenv("CHAT_SESSION_IDLE_SEC", 1800))
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("CHAT_SESSION_PATH", "chat_sessions.db"), max_sessions, idle_ttl_sec)
+    if backend == "memory":
+        return MemorySessionStore(max_sessions, idle_ttl_sec)
+    raise ValueError(f"Unknown CHAT_SESSION_BACKEND {backend!r}")
+
+
+_session_store = _from_env()
+
+
+def get_session_store():
+    return _session_store
+
+
+def set_session_store(store):
+    """Swap the process-wide store (e.g. a fresh in-memory instance)."""
+    global _session_store
+    _session_store = store
@@ -0,0 +1,40 @@
+import base64
+import json
+from itertools import islice
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+
+
+def upsert_insert(model):
+    """INSERT construct for the bound dialect that supports ON CONFLICT (PostgreSQL and SQLite)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Bulk upserts are not supported on {dialect}")
+
+
+def chunked(items, size):
+    """Lazily split an iterable into lists of at most `size` items (keeps IN lists and VALUES under driver limits)."""
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def encode_cursor(*values):
+    """Opaque, URL-safe keyset cursor for a tuple of JSON-serializable values."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """Values of a cursor made by `encode_cursor`; raises ValueError when it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,73 @@
+"""
+Offline stand-in for the Bedrock model, selected with CHAT_MODEL_BACKEND=fake.
+
+It speaks the Strands model streaming protocol, so the agent, its tool loop
+and the chat SSE endpoint run unchanged without AWS credentials. The reply
+echoes the last user message token by token with a configurable delay; when
+`tool_name` is set, the first turn requests that tool before answering.
+"""
+import asyncio
+import json
+import uuid
+
+from strands.models import Model
+
+
+class FakeStreamingModel(Model):
+    def __init__(self, token_delay_ms=20, tool_name=None, tool_input=None, reply_prefix="You asked:"):
+        self.config = {
+            "token_delay_ms": token_delay_ms,
+            "tool_name": tool_name,
+            "tool_input": tool_input or {},
+            "reply_prefix": reply_prefix,
+        }
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("FakeStreamingModel does not support structured output")
+        yield  # pragma: no cover - makes this an async generator
+
+    @staticmethod
+    def _last_user_text(messages):
+        for message in reversed(messages):
+            if message["role"] != "user":
+                continue
+            texts = [block["text"] for block in message["content"] if "text" in block]
+            if texts:
+                return " ".join(texts)
+        return ""
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        delay = self.config["token_delay_ms"] / 1000
+        answered_tool = any("toolResult" in block for block in messages[-1]["content"])
+
+        yield {"messageStart": {"role": "assistant"}}
+
+        tool_name = self.config["tool_name"]
+        if tool_name and not answered_tool and any(s["name"] == tool_name for s in tool_specs or []):
+            tool_use = {"toolUseId": f"fake-{uuid.uuid4().hex[:8]}", "name": tool_name}
+            yield {"contentBlockStart": {"start": {"toolUse": tool_use}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(self.config["tool_input"])}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+            return
+
+        words = f"{self.config['reply_prefix']} {self._last_user_text(messages)}".split()
+        yield {"contentBlockStart": {"start": {}}}
+        for i, word in enumerate(words):
+            if delay:
+                await asyncio.sleep(delay)
+            yield {"contentBlockDelta": {"delta": {"text": word + (" " if i < len(words) - 1 else "")}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": 0, "outputTokens": len(words), "totalTokens": len(words)},
+                "metrics": {"latencyMs": 0},
+            }
+        }
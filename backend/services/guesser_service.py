@@ -0,0 +1,219 @@
+"""
+League Guesser question pools.
+
+Questions are generated at sync time from data the backend already keeps -
+recent games (`participants`), the `player_stats` rollup and the kill-event
+heatmaps - and stored one row per question, addressed by (pool_id, position).
+A pool is rebuilt only when its source data changed, and every rebuild bumps
+its version.
+
+Serving never samples the table: a session is a signed token holding an
+affine permutation of the pool, position(i) = (a * i + b) mod size with
+gcd(a, size) = 1, plus the index of the next question. A batch is therefore
+one primary-key lookup of `count` positions, and a session walks the whole
+pool in random order without repeats. A token whose pool was rebuilt since is
+rejected, since its positions now point at different questions.
+"""
+import math
+import secrets
+from datetime import datetime
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import func, select
+
+from extensions import db
+from models.schema import GuesserPool, GuesserQuestion, Match, Participant, Player, PlayerStat
+from services import timeline_service
+from services.db_utils import chunked
+
+GLOBAL_SCOPE = "global"
+MATCH_QUESTIONS = 100  # newest games of a player turned into questions
+MIN_CHAMPION_GAMES = 3  # per-player champion questions need this many games
+MIN_GLOBAL_GAMES = 20  # global champion questions need this many games over all players
+HOTSPOT_CHAMPIONS = 3  # most played champions that get map questions
+HOTSPOT_BINS = 8  # map cells per axis a hotspot answer is given in
+MIN_HOTSPOT_EVENTS = 5
+MAX_BATCH = 50
+INSERT_CHUNK = 500
+
+
+class StaleSession(Exception):
+    """The session's pool was rebuilt (or removed); start a new session."""
+
+
+def _scope(player):
+    return f"player:{player.id}" if player else GLOBAL_SCOPE
+
+
+def _match_questions(player):
+    rows = db.session.execute(
+        select(Match.match_id, Match.queue_id, Participant.timestamp, Participant.champion_name, Participant.role,
+               Participant.kills, Participant.deaths, Participant.assists, Participant.win)
+        .join(Match, Match.id == Participant.match_id)
+        .where(Participant.player_id == player.id)
+        .order_by(Participant.timestamp.desc())
+        .limit(MATCH_QUESTIONS)
+    ).all()
+    return [("match_kda", {
+        "prompt": {"match_id": r.match_id, "queue_id": r.queue_id, "date": r.timestamp.date().isoformat(),
+                   "champion": r.champion_name, "role": r.role},
+        "answer": {"kills": r.kills, "deaths": r.deaths, "assists": r.assists, "win": r.win},
+    }) for r in rows if r.timestamp]
+
+
+def _champion_totals(player_id, min_games):
+    q = (
+        select(PlayerStat.champion_name, func.sum(PlayerStat.games).label("games"),
+               func.sum(PlayerStat.wins).label("wins"), func.sum(PlayerStat.kills).label("kills"),
+               func.sum(PlayerStat.deaths).label("deaths"), func.sum(PlayerStat.assists).label("assists"))
+        .group_by(PlayerStat.champion_name)
+        .having(func.sum(PlayerStat.games) >= min_games)
+        .order_by(func.sum(PlayerStat.games).desc(), PlayerStat.champion_name)
+    )
+    if player_id is not None:
+        q = q.where(PlayerStat.player_id == player_id)
+    return db.session.execute(q).all()
+
+
+def _champion_questions(totals):
+    questions = []
+    for c in totals:
+        prompt = {"champion": c.champion_name, "games": int(c.games)}
+        questions.append(("champion_win_rate", {
+            "prompt": prompt, "answer": {"win_rate": round(c.wins / c.games, 4)},
+        }))
+        questions.append(("champion_kda", {
+            "prompt": prompt,
+            "answer": {"kills": round(c.kills / c.games, 1), "deaths": round(c.deaths / c.games, 1),
+                       "assists": round(c.assists / c.games, 1)},
+        }))
+    return questions
+
+
+def _hotspot_questions(player, champions):
+    questions = []
+    cell = timeline_service.MAP_SIZE / HOTSPOT_BINS
+    for champion in champions[:HOTSPOT_CHAMPIONS]:
+        for side in ("blue", "red"):
+            for kind in timeline_service.KINDS:
+                heatmap = timeline_service.get_heatmap(player, champion=champion, side=side, kind=kind,
+                                                       bins=HOTSPOT_BINS)
+                if heatmap["total"] < MIN_HOTSPOT_EVENTS:
+                    continue
+                grid = heatmap["grid"]
+                row, col = max(((r, c) for r in range(HOTSPOT_BINS) for c in range(HOTSPOT_BINS)),
+                               key=lambda rc: grid[rc[0]][rc[1]])
+                questions.append(("hotspot", {
+                    "prompt": {"champion": champion, "side": side, "kind": kind,
+                               "map_size": timeline_service.MAP_SIZE, "bins": HOTSPOT_BINS},
+                    "answer": {"row": row, "col": col, "x": round((col + 0.5) * cell), "y": round((row + 0.5) * cell),
+                               "share": round(grid[row][col] / heatmap["total"], 4)},
+                }))
+    return questions
+
+
+def _data_version(player):
+    if player:
+        return "|".join(s.isoformat() if s else "" for s in (player.last_updated, player.data_changed_at))
+    newest = db.session.execute(select(func.max(Player.data_changed_at))).scalar()
+    return newest.isoformat() if newest else ""
+
+
+def build_pool(player=None, force=False):
+    """
+    (Re)build the pool of a player, or the global pool when `player` is None.
+
+    Skipped while the source data is unchanged unless `force`. The caller commits.
+    Returns the pool.
+    """
+    scope = _scope(player)
+    pool = GuesserPool.query.filter_by(scope=scope).first()
+    data_version = _data_version(player)
+    if pool and pool.data_version == data_version and not force:
+        return pool
+
+    if player:
+        totals = _champion_totals(player.id, MIN_CHAMPION_GAMES)
+        questions = (_match_questions(player) + _champion_questions(totals)
+                     + _hotspot_questions(player, [c.champion_name for c in totals]))
+    else:
+        questions = _champion_questions(_champion_totals(None, MIN_GLOBAL_GAMES))
+
+    if pool is None:
+        pool = GuesserPool(scope=scope, player_id=player.id if player else None, version=0)
+        db.session.add(pool)
+        db.session.flush()
+    else:
+        GuesserQuestion.query.filter_by(pool_id=pool.id).delete(synchronize_session=False)
+    rows = [{"pool_id": pool.id, "position": i, "kind": kind, "payload": payload}
+            for i, (kind, payload) in enumerate(questions)]
+    for chunk in chunked(rows, INSERT_CHUNK):
+        db.session.execute(GuesserQuestion.__table__.insert(), chunk)
+    pool.version += 1
+    pool.size = len(rows)
+    pool.data_version = data_version
+    pool.built_at = datetime.utcnow()
+    return pool
+
+
+def build_pools(puuids):
+    """Rebuild the pools of the given players (those whose data changed); the caller commits."""
+    for player in Player.query.filter(Player.puuid.in_(puuids)):
+        build_pool(player)
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt="guesser-session")
+
+
+def _new_permutation(size):
+    a = 1
+    if size > 2:
+        a = secrets.randbelow(size - 1) + 1
+        while math.gcd(a, size) != 1:
+            a = secrets.randbelow(size - 1) + 1
+    return a, secrets.randbelow(size) if size else 0
+
+
+def get_pool(player=None):
+    return GuesserPool.query.filter_by(scope=_scope(player)).first()
+
+
+def start_session(pool):
+    """Token of a new session over `pool`: a fresh random permutation, positioned at its start."""
+    a, b = _new_permutation(pool.size)
+    return _serializer().dumps([pool.id, pool.version, a, b, 0])
+
+
+def next_questions(token, count):
+    """
+    The next `count` questions of a session and the token to continue it
+    (None once the pool is exhausted). Raises ValueError for a forged or
+    malformed token and StaleSession when the pool was rebuilt.
+    """
+    try:
+        pool_id, version, a, b, index = _serializer().loads(token)
+    except (BadSignature, TypeError, ValueError) as e:
+        raise ValueError("Invalid session token") from e
+    pool = db.session.get(GuesserPool, pool_id)
+    if pool is None or pool.version != version:
+        raise StaleSession("The question pool was rebuilt; start a new session")
+
+    end = min(index + count, pool.size)
+    positions = [(a * i + b) % pool.size for i in range(index, end)]
+    rows = {
+        q.position: q for q in
+        GuesserQuestion.query.filter(GuesserQuestion.pool_id == pool.id, GuesserQuestion.position.in_(positions))
+    } if positions else {}
+    if len(rows) != len(positions):
+        # The pool was rebuilt (and committed) since its version was read above
+        raise StaleSession("The question pool was rebuilt; start a new session")
+    questions = [{"id": f"{pool.id}-{version}-{p}", "kind": rows[p].kind, **rows[p].payload} for p in positions]
+    next_token = _serializer().dumps([pool_id, version, a, b, end]) if end < pool.size else None
+    return {
+        "questions": questions,
+        "served": end,
+        "remaining": pool.size - end,
+        "next_token": next_token,
+    }
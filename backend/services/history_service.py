@@ -0,0 +1,84 @@
+"""
+Paginated match history of a player.
+
+Pages are read newest first with keyset pagination on (timestamp, id) of the
+player's participant rows, so every page is one bounded range read on
+ix_participants_player_timestamp no matter how deep the client pages. The
+participant row and its match are selected column-wise in a single joined
+query and turned straight into dicts, without building ORM objects.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+from extensions import db
+from models.schema import Match, Participant
+from services.db_utils import decode_cursor, encode_cursor
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+_COLUMNS = (
+    Participant.id,
+    Match.match_id,
+    Match.queue_id,
+    Participant.timestamp,
+    Participant.champion_name,
+    Participant.role,
+    Participant.team_id,
+    Participant.win,
+    Participant.kills,
+    Participant.deaths,
+    Participant.assists,
+    Participant.gold_earned,
+    Participant.damage_dealt,
+)
+
+
+def get_match_history(player_id, cursor=None, limit=DEFAULT_LIMIT, queue_id=None, champion=None,
+                      role=None, win=None, date_from=None, date_to=None):
+    """One page of a player's matches, newest first; `date_to` is exclusive."""
+    filters = [Participant.player_id == player_id]
+    if queue_id is not None:
+        filters.append(Match.queue_id == queue_id)
+    if champion:
+        filters.append(Participant.champion_name == champion)
+    if role:
+        filters.append(Participant.role == role)
+    if win is not None:
+        filters.append(Participant.win == win)
+    if date_from:
+        filters.append(Participant.timestamp >= date_from)
+    if date_to:
+        filters.append(Participant.timestamp < date_to)
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor, 2)
+        try:
+            timestamp, row_id = datetime.fromisoformat(timestamp), int(row_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        # Expanded row comparison so both SQLite and PostgreSQL keep it an index range
+        filters.append(or_(
+            Participant.timestamp < timestamp,
+            and_(Participant.timestamp == timestamp, Participant.id < row_id),
+        ))
+
+    rows = db.session.execute(
+        select(*_COLUMNS)
+        .join(Match, Match.id == Participant.match_id)
+        .where(*filters)
+        .order_by(Participant.timestamp.desc(), Participant.id.desc())
+        .limit(limit + 1)
+    ).mappings().all()
+
+    matches = []
+    for row in rows[:limit]:
+        match = dict(row)
+        match["timestamp"] = row["timestamp"].isoformat() if row["timestamp"] else None
+        matches.append(match)
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["timestamp"].isoformat(), last["id"])
+    return {"matches": matches, "next_cursor": next_cursor}
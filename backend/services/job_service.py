@@ -0,0 +1,155 @@
+"""
+Database-backed queue for player sync jobs.
+
+`POST /players/<puuid>/sync` only enqueues a `SyncJob` row; worker threads
+(started lazily in the web process, or standalone via `flask sync-worker`)
+claim queued jobs with a conditional UPDATE, so any number of processes can
+drain the same queue without Redis. A partial unique index allows one active
+job per puuid, which makes repeated sync requests coalesce onto that job.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.schema import SyncJob
+from services.guesser_service import build_pools
+from services.mastery_service import sync_mastery
+from services.match_service import update_player_matches
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def get_job(job_id):
+    return db.session.get(SyncJob, job_id)
+
+
+def get_active_job(puuid):
+    return SyncJob.query.filter(SyncJob.puuid == puuid, SyncJob.status.in_(ACTIVE_STATUSES)).first()
+
+
+def enqueue_sync(puuid, region="americas"):
+    """Queue a sync for a player, or return the job already queued/running for it."""
+    existing = get_active_job(puuid)
+    if existing:
+        return existing
+    job = SyncJob(puuid=puuid, region=region, status="queued")
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request queued the same puuid between our check and insert
+        db.session.rollback()
+        return get_active_job(puuid)
+    return job
+
+
+def claim_next_job():
+    """Atomically move the oldest runnable job to "running" and return it (or None)."""
+    stale_before = datetime.utcnow() - timedelta(seconds=current_app.config["SYNC_JOB_STALE_SEC"])
+    runnable = or_(
+        SyncJob.status == "queued",
+        # A worker that died mid-sync stops heartbeating; hand its job to someone else
+        (SyncJob.status == "running") & (SyncJob.heartbeat_at < stale_before),
+    )
+    candidates = SyncJob.query.filter(runnable).order_by(SyncJob.id).limit(5).all()
+    for job in candidates:
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job.id, runnable)
+            .values(status="running", started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+    return None
+
+
+def run_job(job):
+    """Run a claimed job to completion, recording progress and outcome on the row."""
+    def progress(processed_count):
+        job.processed_count = processed_count
+        job.heartbeat_at = datetime.utcnow()
+
+    try:
+        out = update_player_matches(job.puuid, current_year=2025, region=job.region, progress=progress)
+        job.status = "done"
+        job.processed_count = out["processed_count"]
+        job.result = {**out, "processed_until": out["processed_until"].isoformat()}
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Sync job %s failed", job.id)
+        job = db.session.get(SyncJob, job.id)
+        job.status = "failed"
+        job.error = str(e)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    if job.status == "done":
+        # After the outcome is committed: the refreshes roll back on failure and must not undo it
+        _refresh_derived(job)
+    return job
+
+
+def _refresh_derived(job):
+    """Best-effort refresh of the player's champion mastery and guesser pool after a sync."""
+    result = dict(job.result)
+    if current_app.config["SYNC_MASTERY"]:
+        try:
+            result["mastery"] = sync_mastery([job.puuid])
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Sync job %s: mastery refresh failed", job.id)
+    try:
+        build_pools([job.puuid])
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Sync job %s: guesser pool rebuild failed", job.id)
+    job.result = result
+    db.session.commit()
+
+
+def work_once():
+    """Claim and run one job; returns False when the queue is empty."""
+    job = claim_next_job()
+    if job is None:
+        return False
+    run_job(job)
+    return True
+
+
+def _worker_loop(app, poll_interval):
+    while True:
+        try:
+            with app.app_context():
+                ran = work_once()
+        except Exception:
+            app.logger.exception("Sync worker error")
+            ran = False
+        if not ran:
+            time.sleep(poll_interval)
+
+
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def start_sync_workers(app, count=None):
+    """Start the in-process worker threads once per process (no-op when SYNC_WORKERS is 0)."""
+    count = app.config["SYNC_WORKERS"] if count is None else count
+    with _workers_lock:
+        while len(_workers) < count:
+            t = threading.Thread(
+                target=_worker_loop,
+                args=(app, app.config["SYNC_POLL_INTERVAL"]),
+                name=f"sync-worker-{len(_workers)}",
+                daemon=True,
+            )
+            t.start()
+            _workers.append(t)
+    return _workers
@@ -0,0 +1,156 @@
+"""
+Response cache in front of the Bedrock knowledge-base `retrieve_and_generate` call.
+
+Entries are keyed on the normalized query text plus the call parameters and
+expire after a TTL; the least recently used entry is evicted once the cache
+is full. With an embedder configured, a miss on the exact key can still hit
+an entry whose query embedding is close enough (cosine similarity above the
+threshold) and was made with the same parameters.
+
+The embedder is any callable ``text -> list[float]``; `HashingEmbedder` is a
+dependency-free local default. Replace the process-wide cache with
+`set_kb_cache(...)`, e.g. a fresh `KnowledgeBaseCache()` in tests.
+"""
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_query(query):
+    """Lowercase and collapse punctuation/whitespace so trivially different phrasings share a key."""
+    return " ".join(_WORD_RE.findall(query.lower()))
+
+
+class HashingEmbedder:
+    """Bag of unigrams and bigrams hashed into a fixed-size, L2-normalized vector."""
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def __call__(self, text):
+        words = normalize_query(text).split()
+        vec = [0.0] * self.dim
+        for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            vec[zlib.crc32(term.encode()) % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class KnowledgeBaseCache:
+    def __init__(self, max_entries=1024, ttl_sec=3600, embedder=None, similarity_threshold=None):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()  # key -> (expires_at, value, vector)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query, params):
+        return normalize_query(query), tuple(sorted(params.items()))
+
+    def _similar(self, key, vector, now):
+        best, best_score = None, self.similarity_threshold
+        for other, (expires_at, value, other_vec) in self._entries.items():
+            if other[1] != key[1] or expires_at <= now or other_vec is None:
+                continue
+            score = _cosine(vector, other_vec)
+            if score >= best_score:
+                best, best_score = other, score
+        return best
+
+    def get(self, query, **params):
+        key = self._key(query, params)
+        now = time.monotonic()
+        vector = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+        if self.embedder and self.similarity_threshold:
+            vector = self.embedder(key[0])
+            with self._lock:
+                match = self._similar(key, vector, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.similar_hits += 1
+                    return self._entries[match][1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, query, value, **params):
+        key = self._key(query, params)
+        vector = self.embedder(key[0]) if self.embedder and self.similarity_threshold else None
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_sec, value, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, query, compute, **params):
+        """Return the cached answer or call ``compute()`` and cache its result (exceptions aren't cached)."""
+        value = self.get(query, **params)
+        if value is None:
+            value = compute()
+            self.put(query, value, **params)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_sec": self.ttl_sec,
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.similar_hits) / lookups, 4) if lookups else None,
+            }
+
+
+def _from_env():
+    threshold = float(os.getenv("KB_CACHE_SIMILARITY", 0)) or None
+    return KnowledgeBaseCache(
+        max_entries=int(os.getenv("KB_CACHE_MAX_ENTRIES", 1024)),
+        ttl_sec=int(os.getenv("KB_CACHE_TTL_SEC", 3600)),
+        embedder=HashingEmbedder() if threshold else None,
+        similarity_threshold=threshold,
+    )
+
+
+_kb_cache = _from_env()
+
+
+def get_kb_cache():
+    return _kb_cache
+
+
+def set_kb_cache(cache):
+    """Swap the process-wide cache (e.g. a fresh in-memory instance, or one with another embedder)."""
+    global _kb_cache
+    _kb_cache = cache
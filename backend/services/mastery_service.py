@@ -0,0 +1,195 @@
+"""
+Champion mastery (champion-mastery-v4), stored as deltas.
+
+`sync_mastery` fetches the full mastery list of many players concurrently on
+the Riot fetch pool (every call still goes through the shared rate
+scheduler), diffs it against `champion_masteries` in one query per batch and
+writes only the champions whose points or level moved: the current row is
+upserted and one point is appended to `champion_mastery_history`, so the
+history is a compact progression series rather than a full snapshot per
+sync. Mastery is a per-server API, so players need a platform; it is learned
+from the prefix of their newest stored match id.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from extensions import db
+from models.schema import ChampionMastery, ChampionMasteryHistory, Match, Participant, Player
+from services.db_utils import chunked, upsert_insert
+from services.riot_api import PLATFORM_REGIONS, get_champion_masteries
+
+UPSERT_CHUNK = 500
+PLAYER_BATCH = 100  # players whose stored mastery is diffed per query / commit
+
+
+def _player_platform(player):
+    """Platform of a player: stored, or learned from their newest match id (then stored)."""
+    if player.platform:
+        return player.platform
+    match_id = db.session.execute(
+        select(Match.match_id)
+        .join(Participant, Participant.match_id == Match.id)
+        .where(Participant.player_id == player.id)
+        .order_by(Participant.timestamp.desc())
+        .limit(1)
+    ).scalar()
+    prefix = match_id.split("_", 1)[0].upper() if match_id else None
+    if prefix in PLATFORM_REGIONS:
+        player.platform = prefix
+        return prefix
+    return None
+
+
+def _to_datetime(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).replace(tzinfo=None) if ms else None
+
+
+def _diff(player_id, entries, stored, now):
+    """(current rows to upsert, history rows) for the entries whose points or level changed."""
+    current, history = [], []
+    for e in entries:
+        points, level = e["championPoints"], e["championLevel"]
+        if stored.get(e["championId"]) == (points, level):
+            continue
+        current.append({
+            "player_id": player_id,
+            "champion_id": e["championId"],
+            "champion_level": level,
+            "champion_points": points,
+            "last_play_time": _to_datetime(e.get("lastPlayTime")),
+            "updated_at": now,
+        })
+        history.append({
+            "player_id": player_id,
+            "champion_id": e["championId"],
+            "recorded_at": now,
+            "champion_level": level,
+            "champion_points": points,
+        })
+    return current, history
+
+
+def _store(current, history, changed_player_ids, now):
+    for rows in chunked(current, UPSERT_CHUNK):
+        stmt = upsert_insert(ChampionMastery).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["player_id", "champion_id"],
+            set_={c: getattr(stmt.excluded, c)
+                  for c in ("champion_level", "champion_points", "last_play_time", "updated_at")},
+        )
+        db.session.execute(stmt)
+    for rows in chunked(history, UPSERT_CHUNK):
+        db.session.execute(ChampionMasteryHistory.__table__.insert(), rows)
+    # New data version, so cached mastery pages of these players are not served
+    for ids in chunked(sorted(changed_player_ids), UPSERT_CHUNK):
+        db.session.execute(update(Player).where(Player.id.in_(ids)).values(data_changed_at=now))
+
+
+def _sync_batch(players, pool, counters):
+    targets = []
+    for player in players:
+        platform = _player_platform(player)
+        if platform:
+            targets.append((player, platform))
+        else:
+            counters["no_platform"] += 1
+
+    stored = {}
+    ids = [p.id for p, _ in targets]
+    for player_id, champion_id, points, level in db.session.execute(
+        select(ChampionMastery.player_id, ChampionMastery.champion_id,
+               ChampionMastery.champion_points, ChampionMastery.champion_level)
+        .where(ChampionMastery.player_id.in_(ids))
+    ):
+        stored.setdefault(player_id, {})[champion_id] = (points, level)
+
+    def fetch(target):
+        player, platform = target
+        try:
+            return get_champion_masteries(player.puuid, platform), None
+        except Exception as e:  # one player's failure must not drop the batch
+            return None, e
+
+    now = datetime.utcnow()
+    current, history, changed = [], [], set()
+    for (player, _), (entries, error) in zip(targets, pool.map(fetch, targets)):
+        if error is not None:
+            counters["failed"] += 1
+            current_app.logger.warning("Mastery of %s not refreshed: %s", player.puuid, error)
+            continue
+        counters["players"] += 1
+        counters["champions"] += len(entries)
+        rows, points = _diff(player.id, entries, stored.get(player.id, {}), now)
+        if rows:
+            current.extend(rows)
+            history.extend(points)
+            changed.add(player.id)
+    counters["changed"] += len(current)
+    _store(current, history, changed, now)
+    db.session.commit()
+
+
+def sync_mastery(puuids=None):
+    """Refresh the champion mastery of the given players (default: all tracked ones); returns counters."""
+    query = Player.query.order_by(Player.id)
+    if puuids is not None:
+        query = query.filter(Player.puuid.in_(puuids))
+    else:
+        query = query.filter(Player.tracked.is_(True))
+    counters = {"players": 0, "champions": 0, "changed": 0, "failed": 0, "no_platform": 0}
+
+    with ThreadPoolExecutor(max_workers=current_app.config["RIOT_FETCH_WORKERS"]) as pool:
+        last_id = 0
+        while True:
+            players = query.filter(Player.id > last_id).limit(PLAYER_BATCH).all()
+            if not players:
+                break
+            _sync_batch(players, pool, counters)
+            last_id = players[-1].id
+
+    counters["unchanged"] = counters["champions"] - counters["changed"]
+    current_app.logger.info("Synced mastery: %s", counters)
+    return counters
+
+
+def get_mastery(player, limit=None):
+    """The player's current mastery, highest points first, with totals over all champions."""
+    rows = db.session.execute(
+        select(ChampionMastery)
+        .where(ChampionMastery.player_id == player.id)
+        .order_by(ChampionMastery.champion_points.desc(), ChampionMastery.champion_id)
+    ).scalars().all()
+    levels = {}
+    updated_at = max((row.updated_at for row in rows), default=None)
+    for row in rows:
+        levels[row.champion_level] = levels.get(row.champion_level, 0) + 1
+    return {
+        "champions": len(rows),
+        "total_points": sum(row.champion_points for row in rows),
+        "levels": [{"level": level, "champions": count} for level, count in sorted(levels.items(), reverse=True)],
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "mastery": [{
+            "champion_id": row.champion_id,
+            "champion_level": row.champion_level,
+            "champion_points": row.champion_points,
+            "last_play_time": row.last_play_time.isoformat() if row.last_play_time else None,
+        } for row in rows[:limit]],
+    }
+
+
+def get_mastery_history(player, champion_id):
+    """Progression of one champion: a point per change seen by a sync, oldest first."""
+    rows = db.session.execute(
+        select(ChampionMasteryHistory.recorded_at, ChampionMasteryHistory.champion_level,
+               ChampionMasteryHistory.champion_points)
+        .where(ChampionMasteryHistory.player_id == player.id, ChampionMasteryHistory.champion_id == champion_id)
+        .order_by(ChampionMasteryHistory.recorded_at)
+    ).all()
+    return [{
+        "recorded_at": recorded_at.isoformat(),
+        "champion_level": level,
+        "champion_points": points,
+    } for recorded_at, level, points in rows]
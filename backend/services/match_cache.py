@@ -0,0 +1,112 @@
+"""
+On-disk store of raw match-v5 payloads.
+
+Match details never change once a game has ended, so every payload fetched
+from Riot is kept gzip-compressed in a single SQLite file keyed by match id.
+`riot_api.get_match_detail` reads it before going to the network, shared games
+between tracked players are fetched once, and the `matches`/`participants`
+tables can be rebuilt from it offline (`flask reingest-matches`).
+Match timelines are stored alongside under the key "<match id>/timeline".
+The file is bounded by size; the least recently read payloads are evicted first.
+"""
+import gzip
+import json
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+
+EVICT_TO_RATIO = 0.9  # evict down to 90% of the limit so we don't evict on every put
+TIMELINE_SUFFIX = "/timeline"
+
+
+class MatchCache:
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS raw_matches ("
+            " match_id TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_raw_matches_accessed_at ON raw_matches (accessed_at)")
+        self._total = self._size_on_disk()
+
+    def _size_on_disk(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM raw_matches").fetchone()[0]
+
+    def get(self, match_id):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM raw_matches WHERE match_id = ?", (match_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE raw_matches SET accessed_at = ? WHERE match_id = ?", (time.time(), match_id))
+        return json.loads(gzip.decompress(row[0]))
+
+    def put(self, match_id, match_json):
+        data = gzip.compress(json.dumps(match_json, separators=(",", ":")).encode(), compresslevel=6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO raw_matches (match_id, data, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (match_id, data, len(data), time.time()),
+            )
+            self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Other processes write to the same file, so re-read the real total first
+        self._total = self._size_on_disk()
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+        while self._total > target:
+            rows = self._conn.execute(
+                "SELECT match_id, size FROM raw_matches ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany("DELETE FROM raw_matches WHERE match_id = ?", [(r[0],) for r in rows])
+            self._total -= sum(r[1] for r in rows)
+
+    def iter_matches(self, batch=200):
+        """Yield every cached match payload (not timelines), reading `batch` rows at a time."""
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT match_id, data FROM raw_matches WHERE match_id > ? ORDER BY match_id LIMIT ?",
+                    (last, batch),
+                ).fetchall()
+            if not rows:
+                return
+            for match_id, data in rows:
+                if "/" not in match_id:
+                    yield json.loads(gzip.decompress(data))
+            last = rows[-1][0]
+
+    def stats(self):
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM raw_matches").fetchone()
+        return {"matches": count, "bytes": size, "max_bytes": self.max_bytes}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_match_cache():
+    """Process-wide cache for the current app, or None when MATCH_CACHE_PATH is empty."""
+    path = current_app.config.get("MATCH_CACHE_PATH")
+    if not path:
+        return None
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            max_bytes = current_app.config["MATCH_CACHE_MAX_MB"] * 1024 * 1024
+            cache = _caches[path] = MatchCache(path, max_bytes)
+        return cache
@@ -1,80 +1,190 @@
 # services/match_service.py (continued)
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from statistics import median
 
 from flask import current_app
+from sqlalchemy import select, update
 from extensions import db
-from models.schema import Player, Match, Participant
-from services.riot_api import get_match_ids_since, get_match_detail
+from models.schema import Player, Match, Participant, SyncCursor
+from services.db_utils import chunked, upsert_insert
+from services.player_service import normalize_riot_id
+from services.riot_api import get_match_ids_since, get_match_detail, get_match_timeline, region_for_match_id
+from services.calendar_service import record_daily_activity
+from services.stats_service import record_participants
+from services.timeline_service import store_timelines
 
 OVERLAP_SEC = 60  # small overlap to be safe
+COMMIT_EVERY = 25  # matches per ingest batch / DB commit
+INSERT_CHUNK = 500  # rows per multi-row INSERT statement
+DIFF_PAGE = 500  # candidate match ids checked against the DB per query
 
 
-def _get_or_create_player_by_puuid(puuid, game_name=None, tag_line=None):
-    p = Player.query.filter_by(puuid=puuid).first()
-    if p:
-        # Fill names if we learn them later
-        updated = False
-        if game_name and not p.game_name:
-            p.game_name, updated = game_name, True
-        if tag_line and not p.tag_line:
-            p.tag_line, updated = tag_line, True
-        if updated:
-            db.session.add(p)
-        return p
-    p = Player(puuid=puuid, game_name=game_name, tag_line=tag_line)
-    db.session.add(p)
-    return p
-
-def _insert_match_and_participants(match_json):
-    meta = match_json["metadata"]
-    info = match_json["info"]
-    match_id = meta["matchId"]
-
-    # Skip if already have this match
-    if Match.query.filter_by(match_id=match_id).first():
-        return info.get("gameStartTimestamp", 0) // 1000
-
-    # Create match
-    m = Match(
-        match_id=match_id,
-        queue_id=info["queueId"],
-        timestamp=datetime.fromtimestamp(info["gameStartTimestamp"] // 1000),  # convert to datetime
-    )
-    db.session.add(m)
-
-    # Participants
-    for p in info["participants"]:
-        # Ensure Player row exists
-        _get_or_create_player_by_puuid(
-            p["puuid"],
-            p.get("riotIdGameName") or None,
-            p.get("riotIdTagline") or None,
+def _player_rows(match_jsons):
+    rows = {}
+    for match_json in match_jsons:
+        region = region_for_match_id(match_json["metadata"]["matchId"])
+        for p in match_json["info"]["participants"]:
+            game_name = p.get("riotIdGameName") or ""
+            tag_line = p.get("riotIdTagline") or ""
+            rows.setdefault(p["puuid"], {
+                "puuid": p["puuid"],
+                "game_name": game_name,
+                "tag_line": tag_line,
+                "riot_id_norm": normalize_riot_id(game_name, tag_line),
+                "region": region,
+            })
+    return list(rows.values())
+
+
+def ingest_matches(match_jsons, timelines=None):
+    """
+    Store a batch of match-v5 payloads with set-based statements.
+
+    Players are upserted in one statement (filling in Riot IDs we learn later)
+    and resolved to ids in one query; matches are inserted with
+    ON CONFLICT DO NOTHING and only the ones actually inserted get their
+    participant rows. `timelines` optionally maps Riot match id -> timeline
+    payload for the same batch. Returns the number of newly stored matches.
+    """
+    by_id = {}
+    for match_json in match_jsons:
+        by_id.setdefault(match_json["metadata"]["matchId"], match_json)
+    if not by_id:
+        return 0
+
+    # Players: one upsert and one lookup for every puuid in the batch
+    players = _player_rows(by_id.values())
+    for rows in chunked(players, INSERT_CHUNK):
+        stmt = upsert_insert(Player).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["puuid"],
+            set_={
+                "game_name": stmt.excluded.game_name,
+                "tag_line": stmt.excluded.tag_line,
+                "riot_id_norm": stmt.excluded.riot_id_norm,
+            },
+            where=(Player.game_name == ""),
         )
+        db.session.execute(stmt)
+    player_ids = {}
+    for puuids in chunked([p["puuid"] for p in players], INSERT_CHUNK):
+        player_ids.update(db.session.execute(
+            select(Player.puuid, Player.id).where(Player.puuid.in_(puuids))
+        ).all())
+
+    # Matches: RETURNING gives back only the rows this batch inserted
+    match_rows = [{
+        "match_id": match_id,
+        "queue_id": mj["info"]["queueId"],
+        "timestamp": datetime.fromtimestamp(mj["info"]["gameStartTimestamp"] // 1000),  # convert to datetime
+    } for match_id, mj in by_id.items()]
+    new_ids = {}
+    for rows in chunked(match_rows, INSERT_CHUNK):
+        stmt = (
+            upsert_insert(Match).values(rows)
+            .on_conflict_do_nothing(index_elements=["match_id"])
+            .returning(Match.match_id, Match.id)
+        )
+        new_ids.update(db.session.execute(stmt).all())
+
+    # Participants of the newly inserted matches, keyed by integer foreign keys
+    participant_rows = []
+    timestamps = {row["match_id"]: row["timestamp"] for row in match_rows}
+    for match_id, pk in new_ids.items():
+        for p in by_id[match_id]["info"]["participants"]:
+            participant_rows.append({
+                "match_id": pk,
+                "timestamp": timestamps[match_id],
+                "participant_id": p.get("participantId"),
+                "player_id": player_ids[p["puuid"]],
+                "team_id": p["teamId"],
+                "champion_name": p["championName"],
+                "win": p["win"],
+                "role": p["role"],
+                "kills": p["kills"],
+                "deaths": p["deaths"],
+                "assists": p["assists"],
+                "gold_earned": p["goldEarned"],
+                "damage_dealt": p["totalDamageDealtToChampions"],
+            })
+    for rows in chunked(participant_rows, INSERT_CHUNK):
+        db.session.execute(
+            upsert_insert(Participant).values(rows)
+            .on_conflict_do_nothing(index_elements=["match_id", "player_id"])
+        )
+
+    # Bump the data version of everyone who got new games (invalidates their cached responses on commit)
+    changed = sorted({row["player_id"] for row in participant_rows})
+    now = datetime.utcnow()
+    for ids in chunked(changed, INSERT_CHUNK):
+        db.session.execute(update(Player).where(Player.id.in_(ids)).values(data_changed_at=now))
+
+    match_meta = {
+        new_ids[row["match_id"]]: (row["queue_id"], row["timestamp"])
+        for row in match_rows if row["match_id"] in new_ids
+    }
+    record_participants(participant_rows, match_meta)
+    record_daily_activity(participant_rows, {pk: (mid, timestamps[mid]) for mid, pk in new_ids.items()})
+
+    if timelines:
+        store_timelines({pk: timelines[mid] for mid, pk in new_ids.items() if timelines.get(mid)})
+
+    return len(new_ids)
 
-        # Insert participant row
-        db.session.add(Participant(
-            match_id=match_id,
-            player_id=p["puuid"],              # if your model uses puuid directly
-            team_id=p["teamId"],
-            champion_name=p["championName"],
-            win=p["win"],
-            role=p["role"],
-            kills=p["kills"],
-            deaths=p["deaths"],
-            assists=p["assists"],
-            gold_earned=p["goldEarned"],
-            damage_dealt=p["totalDamageDealtToChampions"],
-        ))
-
-    return info.get("gameStartTimestamp", 0) // 1000
-
-def update_player_matches(puuid, current_year=2025, region="americas"):
-    # Load the player
-    player = Player.query.filter_by(puuid=puuid).first()
-    if not player:
-        raise ValueError("Player not found")
 
+def _fetch_match_details(match_ids, region, workers, with_timelines=False):
+    """
+    Fetch match details on a bounded thread pool while preserving input order.
+
+    Yields (match_json, timeline_json, latency_sec) in the order match ids were
+    produced (timeline_json is None unless requested and available), so the
+    caller can keep writing to the DB sequentially while later fetches overlap.
+    At most ``2 * workers`` requests are in flight; pacing is left to the
+    shared Riot rate scheduler.
+    """
+    app = current_app._get_current_object()
+
+    def fetch(match_id):
+        with app.app_context():
+            started = time.perf_counter()
+            match_json = get_match_detail(match_id, region=region)
+            timeline_json = None
+            if with_timelines:
+                try:
+                    timeline_json = get_match_timeline(match_id, region=region)
+                except RuntimeError as e:
+                    # A missing timeline only costs us the heatmap data for this game
+                    current_app.logger.warning("timeline error: %s", e)
+            return match_json, timeline_json, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for match_id in match_ids:
+            pending.append(pool.submit(fetch, match_id))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _fetch_stats(latencies, elapsed):
+    if not latencies:
+        return {"fetched": 0, "elapsed_sec": round(elapsed, 3)}
+    ordered = sorted(latencies)
+    return {
+        "fetched": len(latencies),
+        "elapsed_sec": round(elapsed, 3),
+        "matches_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": round(median(ordered) * 1000, 1),
+        "latency_p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1),
+        "latency_max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+def _sync_window(player, current_year):
+    """(start_time, end_time) in epoch seconds of the matches a player still needs."""
     if player.last_updated is None:
         last_updated_ts = 0
     else:
@@ -85,26 +195,216 @@ def update_player_matches(puuid, current_year=2025, region="americas"):
 
     start_time = max(last_updated_ts - OVERLAP_SEC, int(datetime(current_year, 1, 1).timestamp()))
     end_time = int(datetime.now().timestamp())
+    return start_time, end_time
+
 
-    print("Updating matches for player", puuid, ", last_updated:", player.last_updated, "start_time:", datetime.fromtimestamp(start_time))
-    
-    num_matches = 0
-    for match_id in get_match_ids_since(puuid, start_time, end_time, region=region, batch=100):
-        match_json = get_match_detail(match_id, region=region)
-        _insert_match_and_participants(match_json)
-        num_matches += 1
-        if num_matches % 10 == 0:
+def _missing_match_ids(candidate_ids, counters, positions=None):
+    """
+    Lazily yield the candidate ids that are not stored yet, each at most once.
+
+    Candidates are diffed against `matches` a page at a time with one IN query,
+    so shared games (already ingested via another player) are never fetched.
+    `positions`, when given, receives match id -> index in `candidate_ids`.
+    """
+    seen = set()
+    index = 0
+    for page in chunked(candidate_ids, DIFF_PAGE):
+        counters["listed"] += len(page)
+        if positions is not None:
+            positions.update((m, index + i) for i, m in enumerate(page))
+        index += len(page)
+        unique = list(dict.fromkeys(m for m in page if m not in seen))
+        seen.update(unique)
+        counters["duplicates"] += len(page) - len(unique)
+        stored = set(db.session.execute(
+            select(Match.match_id).where(Match.match_id.in_(unique))
+        ).scalars())
+        counters["already_stored"] += len(stored)
+        for match_id in unique:
+            if match_id not in stored:
+                yield match_id
+
+
+def _fetch_and_ingest(candidate_ids, region, counters, progress=None, checkpoint=None):
+    """
+    Fetch every missing candidate once on the worker pool and ingest them in ordered batches.
+
+    `checkpoint(consumed)` is called before each batch commit with how many
+    candidates are fully handled; fetches complete in candidate order, so
+    everything before `consumed` is stored once the commit goes through.
+    """
+    pending = []
+    pending_timelines = {}
+    latencies = []
+    positions = {} if checkpoint else None
+    started = time.perf_counter()
+    workers = current_app.config["RIOT_FETCH_WORKERS"]
+    with_timelines = current_app.config["FETCH_TIMELINES"]
+    missing = _missing_match_ids(candidate_ids, counters, positions)
+    for match_json, timeline_json, latency in _fetch_match_details(missing, region, workers, with_timelines):
+        match_id = match_json["metadata"]["matchId"]
+        pending.append(match_json)
+        pending_timelines[match_id] = timeline_json
+        latencies.append(latency)
+        if len(pending) >= COMMIT_EVERY:
+            ingest_matches(pending, pending_timelines)
+            if progress:
+                progress(counters["listed"])
+            if checkpoint:
+                checkpoint(positions[match_id] + 1)
             db.session.commit()
-            print(f"Committed {num_matches} matches so far...")
+            pending, pending_timelines = [], {}
+            current_app.logger.debug("Committed %d matches so far", len(latencies))
+    ingest_matches(pending, pending_timelines)
+
+    counters["fetched"] = len(latencies)
+    counters["fetches_saved"] = counters["listed"] - counters["fetched"]
+    return _fetch_stats(latencies, time.perf_counter() - started)
+
+
+def _new_counters():
+    return {"listed": 0, "duplicates": 0, "already_stored": 0, "fetched": 0, "fetches_saved": 0}
+
 
+def update_player_matches(puuid, current_year=2025, region="americas", progress=None):
+    """
+    Sync a player's matches since their last sync.
+
+    The window and how far down Riot's (newest-first) id list we got are kept
+    in a `SyncCursor` committed with every ingest batch; a sync that dies
+    midway resumes from the same window and offset on its next run, and
+    `last_updated` only moves to the window end once the whole window is stored.
+    """
+    # Load the player
+    player = Player.query.filter_by(puuid=puuid).first()
+    if not player:
+        raise ValueError("Player not found")
+
+    cursor = SyncCursor.query.filter_by(player_id=player.id).first()
+    if cursor is None:
+        start_time, end_time = _sync_window(player, current_year)
+        cursor = SyncCursor(player_id=player.id, window_start=start_time, window_end=end_time, next_offset=0)
+        db.session.add(cursor)
+        current_app.logger.info("Syncing %s from %s (last updated %s)", puuid, datetime.fromtimestamp(start_time),
+                                player.last_updated)
+    else:
+        start_time, end_time = cursor.window_start, cursor.window_end
+        current_app.logger.info("Resuming sync for %s at offset %d of window %s - %s", puuid, cursor.next_offset,
+                                datetime.fromtimestamp(start_time), datetime.fromtimestamp(end_time))
+    resumed_from = cursor.next_offset
+
+    def checkpoint(consumed):
+        cursor.next_offset = resumed_from + consumed
+        cursor.updated_at = datetime.utcnow()
+
+    counters = _new_counters()
+    match_ids = get_match_ids_since(puuid, start_time, end_time, region=region, batch=100, offset=resumed_from)
+    fetch_stats = _fetch_and_ingest(match_ids, region, counters, progress, checkpoint)
+
+    # Window complete: advance the watermark and drop the cursor in the same commit
     player.last_updated = datetime.fromtimestamp(end_time)
+    player.tracked = True
     db.session.add(player)
+    db.session.delete(cursor)
     db.session.commit()
 
+    current_app.logger.info("Synced %s: %s %s", puuid, counters, fetch_stats)
+
     return {
         "puuid": puuid,
         "from": start_time,
         "to": end_time,
+        "resumed_from": resumed_from,
         "processed_until": player.last_updated,
-        "processed_count": num_matches
-    }
\ No newline at end of file
+        "processed_count": counters["listed"],
+        "counters": counters,
+        "fetch_stats": fetch_stats,
+    }
+
+
+def reconcile_player_matches(puuid, current_year=2025, region="americas", window_days=7):
+    """
+    Find and backfill holes in a player's stored history up to last_updated.
+
+    The synced range is split into `window_days` windows; each costs one id
+    listing call and one IN query, and only windows with match ids missing
+    from `matches` (e.g. a page that failed during an earlier sync) trigger
+    detail fetches. Returns the windows that had gaps and what was fetched.
+    """
+    player = Player.query.filter_by(puuid=puuid).first()
+    if not player:
+        raise ValueError("Player not found")
+    if player.last_updated is None:
+        return {"puuid": puuid, "gaps": [], "counters": _new_counters()}
+
+    start = int(datetime(current_year, 1, 1).timestamp())
+    end = int(player.last_updated.timestamp())
+    step = window_days * 86400
+    counters = _new_counters()
+    gaps = []
+    for window_start in range(start, end, step):
+        window_end = min(window_start + step, end)
+        window = _new_counters()
+        ids = get_match_ids_since(puuid, window_start, window_end, region=region, batch=100)
+        _fetch_and_ingest(ids, region, window)
+        if window["fetched"]:
+            db.session.commit()
+            gaps.append({"from": window_start, "to": window_end, "missing": window["fetched"]})
+        for key in ("listed", "already_stored", "fetched"):
+            counters[key] += window[key]
+    counters["fetches_saved"] = counters["listed"] - counters["fetched"]
+
+    current_app.logger.info("Reconciled %s: %d gap windows, %s", puuid, len(gaps), counters)
+    return {"puuid": puuid, "from": start, "to": end, "gaps": gaps, "counters": counters}
+
+
+def sync_players(puuids, current_year=2025, region="americas", progress=None):
+    """
+    Sync a batch of players that share one routing region.
+
+    The candidate match ids of every player are listed first and merged, so a
+    game played together by several tracked players is fetched exactly once;
+    the merged list is then diffed against `matches` and only missing games
+    are fetched. The counters report how many fetches that saved.
+
+    `progress(count)` is called after each player's listing (with the ids
+    listed so far) and before each ingest batch commit.
+    """
+    players = Player.query.filter(Player.puuid.in_(puuids)).all()
+    found = {p.puuid for p in players}
+    unknown = [p for p in puuids if p not in found]
+    if unknown:
+        raise ValueError(f"Players not found: {', '.join(unknown)}")
+
+    windows = {}
+    candidate_ids = []
+    listed_per_player = {}
+    for player in players:
+        start_time, end_time = _sync_window(player, current_year)
+        windows[player.puuid] = (start_time, end_time)
+        ids = list(get_match_ids_since(player.puuid, start_time, end_time, region=region, batch=100))
+        listed_per_player[player.puuid] = len(ids)
+        candidate_ids.extend(ids)
+        if progress:
+            progress(len(candidate_ids))
+            db.session.commit()  # nothing else is pending while listing; makes the caller's heartbeat visible
+
+    counters = _new_counters()
+    fetch_stats = _fetch_and_ingest(candidate_ids, region, counters, progress)
+
+    for player in players:
+        player.last_updated = datetime.fromtimestamp(windows[player.puuid][1])
+        player.tracked = True
+        db.session.add(player)
+    # The new windows cover any half-finished single-player window, so its cursor is obsolete
+    SyncCursor.query.filter(SyncCursor.player_id.in_([p.id for p in players])).delete(synchronize_session=False)
+    db.session.commit()
+
+    current_app.logger.info("Synced %d players: %s %s", len(players), counters, fetch_stats)
+
+    return {
+        "players": len(players),
+        "listed_per_player": listed_per_player,
+        "counters": counters,
+        "fetch_stats": fetch_stats,
+    }
@@ -0,0 +1,117 @@
+"""
+Player context for the chat agent, served from our own database.
+
+`get_player_context` renders a compact plain-text summary of a player - totals,
+roles, recent months, queues and most played champions - from the
+`player_stats` rollup, trimmed to a token budget (CHAT_CONTEXT_TOKENS, at
+~4 characters per token) so it can go into the system prompt of every chat turn.
+Summaries are cached per player and version (`last_updated`,
+`data_changed_at`), so a conversation pays for the rollup reads once and a
+sync or timezone change is picked up on the next turn.
+
+`query_player_stats` is what the agent's `get_player_stats` tool returns: the
+rollup breakdown for a filter, as compact JSON, in milliseconds instead of a
+knowledge-base round trip.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from models.schema import Player
+from services import stats_service
+
+CONTEXT_CACHE_SIZE = 1024
+TOP_CHAMPIONS = 8
+RECENT_MONTHS = 3
+MAX_GROUPS = 15  # groups returned by one tool call
+
+_contexts = OrderedDict()  # (player_id, version) -> summary text
+_contexts_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def _line(label, s):
+    return (f"{label}: {s['games']} games, {s['win_rate'] * 100:.0f}% win rate, "
+            f"KDA {s['kda']} ({s['kills'] / s['games']:.1f}/{s['deaths'] / s['games']:.1f}/"
+            f"{s['assists'] / s['games']:.1f})")
+
+
+def _sections(player):
+    """Summary sections, most important first, as (heading or None, lines)."""
+    overall = stats_service.get_player_stats(player.id, group_by="role")
+    totals = overall["totals"]
+    name = f"{player.game_name}#{player.tag_line}"
+    if not totals["games"]:
+        return [(None, [f"Player {name}: no games stored yet."])]
+
+    sections = [(None, [
+        _line(f"Player {name}", totals) + f", avg damage {totals['avg_damage']:.0f}, avg gold {totals['avg_gold']:.0f}",
+        "Roles: " + "; ".join(f"{g['role'] or 'NONE'} {g['games']} ({g['win_rate'] * 100:.0f}% WR)"
+                               for g in overall["groups"]),
+    ])]
+    months = sorted(stats_service.get_player_stats(player.id, group_by="month")["groups"],
+                    key=lambda g: g["month"], reverse=True)
+    sections.append(("Recent months:", ["- " + _line(g["month"], g) for g in months[:RECENT_MONTHS]]))
+    queues = stats_service.get_player_stats(player.id, group_by="queue")["groups"]
+    sections.append((None, ["Queues: " + "; ".join(f"{g['queue']} {g['games']} ({g['win_rate'] * 100:.0f}% WR)"
+                                                   for g in queues)]))
+    champions = stats_service.get_player_stats(player.id, group_by="champion")["groups"]
+    sections.append(("Most played champions:", ["- " + _line(g["champion"], g) for g in champions[:TOP_CHAMPIONS]]))
+    return sections
+
+
+def build_player_context(player, budget):
+    """Summary text of at most ~`budget` tokens; lower-priority lines are dropped first."""
+    lines, used = [], 0
+    for heading, section in _sections(player):
+        for i, line in enumerate(section):
+            if heading and i == 0:  # a heading only goes in with its first line
+                line = f"{heading}\n{line}"
+            cost = estimate_tokens(line)
+            if used + cost > budget:
+                return "\n".join(lines)
+            lines.append(line)
+            used += cost
+    return "\n".join(lines)
+
+
+def _version(player):
+    return tuple(s.isoformat() if s else None for s in (player.last_updated, player.data_changed_at))
+
+
+def get_player_context(puuid):
+    """Cached summary of a stored player, or None for an unknown puuid. Needs an app context."""
+    player = Player.query.filter_by(puuid=puuid).first()
+    if player is None:
+        return None
+    key = (player.id, _version(player))
+    with _contexts_lock:
+        if key in _contexts:
+            _contexts.move_to_end(key)
+            return _contexts[key]
+
+    text = build_player_context(player, current_app.config["CHAT_CONTEXT_TOKENS"])
+    with _contexts_lock:
+        _contexts[key] = text
+        while len(_contexts) > CONTEXT_CACHE_SIZE:
+            _contexts.popitem(last=False)
+    return text
+
+
+def query_player_stats(puuid, champion=None, role=None, queue_id=None, month_from=None, month_to=None,
+                       group_by="champion"):
+    """Rollup stats for the agent tool, as compact JSON. Needs an app context."""
+    if group_by not in stats_service.GROUP_COLUMNS:
+        return f"group_by must be one of {', '.join(stats_service.GROUP_COLUMNS)}"
+    player = Player.query.filter_by(puuid=puuid).first()
+    if player is None:
+        return f"No stored games for player {puuid}; their data has not been synced."
+    stats = stats_service.get_player_stats(player.id, champion=champion, role=role, queue_id=queue_id,
+                                           month_from=month_from, month_to=month_to, group_by=group_by)
+    stats["groups"] = stats["groups"][:MAX_GROUPS]
+    return json.dumps(stats, separators=(",", ":"))
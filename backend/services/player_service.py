@@ -1,6 +1,46 @@
+from flask import current_app
+from sqlalchemy import and_, func, or_, select
+
 from extensions import db
 from models.schema import Player
-from services.riot_api import get_puuid
+from services.calendar_service import get_zone
+from services.db_utils import decode_cursor, encode_cursor
+from services.puuid_cache import puuid_cache
+from services.riot_api import PLATFORM_REGIONS, ROUTING_REGIONS, lookup_account
+
+DIRECTORY_LIMIT = 50
+MAX_DIRECTORY_LIMIT = 200
+_DIRECTORY_COLUMNS = (Player.id, Player.puuid, Player.game_name, Player.tag_line, Player.region, Player.last_updated)
+
+def normalize_riot_id(game_name, tag_line):
+    """Case-folded "game_name#tag_line" ("" while the game name is unknown)."""
+    if not game_name:
+        return ""
+    return f"{game_name.strip()}#{(tag_line or '').strip()}".casefold()
+
+def resolve_puuid(game_name, tag_line, region="americas"):
+    """
+    Puuid of a Riot ID from the players table, else the in-process cache, else account-v1.
+
+    Concurrent lookups of the same Riot ID share one Riot call. Returns None when
+    the Riot ID doesn't exist (remembered briefly) or the lookup failed (not remembered).
+    """
+    key = normalize_riot_id(game_name, tag_line)
+    puuid = db.session.execute(select(Player.puuid).where(Player.riot_id_norm == key).limit(1)).scalar()
+    if puuid:
+        return puuid
+
+    def fetch():
+        status, found = lookup_account(game_name, tag_line, region)
+        if status not in (200, 404):
+            raise RuntimeError(f"account-v1 lookup failed with status {status}")
+        return found
+
+    try:
+        return puuid_cache.get_or_fetch(key, fetch)
+    except RuntimeError as e:
+        current_app.logger.warning("Could not resolve %s#%s: %s", game_name, tag_line, e)
+        return None
 
 def get_player_by_puuid(puuid):
     """Fetch a player from the DB by puuid"""
@@ -11,27 +51,97 @@ def create_player(data):
 
     game_name = data.get("game_name")
     tag_line = data.get("tag_line")
-    region = data.get("region").lower()
+    region = (data.get("region") or "").lower()
+    if region not in ROUTING_REGIONS:
+        raise ValueError(f"region must be one of {', '.join(ROUTING_REGIONS)}")
     puuid = data.get("puuid")
+    timezone = data.get("timezone") or "UTC"
+    get_zone(timezone)
+    platform = (data.get("platform") or "").upper() or None
+    if platform and platform not in PLATFORM_REGIONS:
+        raise ValueError(f"Unknown platform {platform}")
     if not puuid:
         if not game_name or not tag_line:
             raise ValueError("Either puuid or both game_name and tag_line must be provided")
-        puuid = get_puuid(game_name, tag_line, region)
+        puuid = resolve_puuid(game_name, tag_line, region)
+        if not puuid:
+            raise ValueError(f"Could not resolve Riot ID {game_name}#{tag_line}")
     
     # Check if player already exists
     existing_player = get_player_by_puuid(puuid)
     if existing_player:
+        if not existing_player.tracked:  # known so far only as someone's co-participant
+            existing_player.tracked = True
+            db.session.commit()
         return existing_player
 
     player = Player(
         puuid=puuid,
         game_name=game_name,
-        tag_line=tag_line
+        tag_line=tag_line,
+        region=region,
+        timezone=timezone,
+        platform=platform,
+        riot_id_norm=normalize_riot_id(game_name, tag_line),
+        tracked=True
     )
     db.session.add(player)
     db.session.commit()
     return player
 
-def list_players():
-    """Return all players"""
-    return Player.query.all()
+def _prefix_filter(prefix):
+    if db.session.get_bind().dialect.name == "postgresql":
+        # LIKE 'prefix%' is served by the pg_trgm index
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return Player.riot_id_norm.like(escaped + "%", escape="\\")
+    # Range on the normalized column is a plain b-tree range on SQLite
+    return and_(Player.riot_id_norm >= prefix, Player.riot_id_norm < prefix + "\U0010ffff")
+
+def directory_version(prefix=None):
+    """Cheap fingerprint of the directory (or of a search's matches), used as the ETag source."""
+    filters = [Player.riot_id_norm != ""]
+    if prefix:
+        filters.append(_prefix_filter(prefix))
+    count, max_id, last = db.session.execute(
+        select(func.count(), func.max(Player.id), func.max(Player.last_updated)).where(*filters)
+    ).one()
+    return f"{count}:{max_id}:{last.isoformat() if last else ''}"
+
+def list_players_page(cursor=None, limit=DIRECTORY_LIMIT, prefix=None):
+    """
+    One page of players with a known Riot ID, ordered by normalized Riot ID.
+
+    Keyset pagination on (riot_id_norm, id); `prefix` restricts the page to
+    Riot IDs starting with it (compared case-insensitively).
+    """
+    filters = [Player.riot_id_norm != ""]
+    if prefix:
+        filters.append(_prefix_filter(prefix))
+    if cursor:
+        norm, player_id = decode_cursor(cursor, 2)
+        filters.append(or_(
+            Player.riot_id_norm > norm,
+            and_(Player.riot_id_norm == norm, Player.id > player_id),
+        ))
+
+    rows = db.session.execute(
+        select(*_DIRECTORY_COLUMNS, Player.riot_id_norm)
+        .where(*filters)
+        .order_by(Player.riot_id_norm, Player.id)
+        .limit(limit + 1)
+    ).mappings().all()
+
+    players = [{
+        "id": row["id"],
+        "puuid": row["puuid"],
+        "game_name": row["game_name"],
+        "tag_line": row["tag_line"],
+        "region": row["region"],
+        "last_updated": row["last_updated"].isoformat() if row["last_updated"] else None,
+    } for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["riot_id_norm"], last["id"])
+    return {"players": players, "next_cursor": next_cursor}
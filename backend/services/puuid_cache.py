@@ -0,0 +1,105 @@
+"""
+In-process cache of Riot ID -> puuid resolutions.
+
+Found puuids are kept for `ttl_sec` and "no such Riot ID" answers (None) for
+the shorter `negative_ttl_sec`; the least recently used entry is evicted once
+the cache is full. Concurrent misses for the same key are coalesced: one
+caller runs the lookup and the others wait for its result (or its exception,
+which is not cached).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PuuidCache:
+    def __init__(self, max_entries=10000, ttl_sec=86400, negative_ttl_sec=300):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.negative_ttl_sec = negative_ttl_sec
+        self._entries = OrderedDict()  # key -> (expires_at, puuid or None)
+        self._inflight = {}  # key -> _Call of the lookup running for it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _cached(self, key, now):
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+        if entry:
+            del self._entries[key]
+        return False, None
+
+    def put(self, key, puuid):
+        ttl = self.ttl_sec if puuid else self.negative_ttl_sec
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, puuid)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key, fetch):
+        """Cached puuid (or None for a cached miss), otherwise the result of a single shared ``fetch()``."""
+        with self._lock:
+            found, puuid = self._cached(key, time.monotonic())
+            if found:
+                return puuid
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+            self.put(key, call.result)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+puuid_cache = PuuidCache(
+    max_entries=Config.PUUID_CACHE_MAX_ENTRIES,
+    ttl_sec=Config.PUUID_CACHE_TTL_SEC,
+    negative_ttl_sec=Config.PUUID_NEGATIVE_TTL_SEC,
+)
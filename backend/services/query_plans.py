@@ -0,0 +1,140 @@
+"""
+EXPLAIN-based checks that the hot read paths use the indexes built for them.
+
+Each entry of HOT_QUERIES builds a representative statement and names the
+indexes that are acceptable for it. `check_query_plans()` runs EXPLAIN on the
+bound database (SQLite or PostgreSQL) and reports which indexes each plan
+used; `flask check-query-plans` fails when any plan misses. On PostgreSQL
+sequential scans are disabled for the check, because with a near-empty CI
+database the planner would legitimately prefer them.
+"""
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select, text
+
+from extensions import db
+from models.schema import ChampionMasteryHistory, Match, Participant, Player, PlayerDailyActivity
+from services.player_service import _prefix_filter
+
+
+def _player_history():
+    return (
+        select(Participant.id, Match.match_id)
+        .join(Match, Match.id == Participant.match_id)
+        .where(
+            Participant.player_id == 1,
+            Participant.timestamp >= datetime(2025, 1, 1),
+            Participant.timestamp < datetime(2026, 1, 1),
+        )
+        .order_by(Participant.timestamp.desc())
+    )
+
+
+def _match_team():
+    return select(Participant.id).where(Participant.match_id == 1, Participant.team_id == 100)
+
+
+def _match_player():
+    return select(Participant.id).where(Participant.match_id == 1, Participant.player_id == 1)
+
+
+def _champion_role():
+    return select(Participant.id).where(Participant.champion_name == "Ahri", Participant.role == "SOLO")
+
+
+def _queue_in_range():
+    return select(Match.id).where(Match.queue_id == 420, Match.timestamp >= datetime(2025, 1, 1))
+
+
+def _recent_matches():
+    return select(Match.id).where(Match.timestamp >= datetime(2025, 1, 1))
+
+
+def _player_prefix():
+    return select(Player.id).where(_prefix_filter("garb"), Player.riot_id_norm != "")
+
+
+def _player_calendar():
+    return select(PlayerDailyActivity.id).where(
+        PlayerDailyActivity.player_id == 1,
+        PlayerDailyActivity.day >= date(2025, 11, 1),
+        PlayerDailyActivity.day < date(2025, 12, 1),
+    )
+
+
+def _mastery_history():
+    return select(ChampionMasteryHistory.champion_points).where(
+        ChampionMasteryHistory.player_id == 1, ChampionMasteryHistory.champion_id == 103,
+    ).order_by(ChampionMasteryHistory.recorded_at)
+
+
+HOT_QUERIES = {
+    "player_history": (_player_history, {"ix_participants_player_timestamp"}),
+    "match_team": (_match_team, {"ix_participants_match_team"}),
+    "match_player": (_match_player, {"uq_participants_match_player"}),
+    "champion_role": (_champion_role, {"ix_participants_champion_role"}),
+    "queue_in_range": (_queue_in_range, {"ix_matches_queue_timestamp"}),
+    "recent_matches": (_recent_matches, {"ix_matches_timestamp", "ix_matches_queue_timestamp"}),
+    "player_prefix": (_player_prefix, {"ix_players_riot_id_norm", "ix_players_riot_id_norm_trgm"}),
+    "player_calendar": (_player_calendar, {"uq_player_daily_activity_player_day"}),
+    "mastery_history": (_mastery_history, {"ix_champion_mastery_history_player_champion"}),
+}
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=db.session.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _sqlite_plan(sql):
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    details = [r[-1] for r in rows]
+    used = set()
+    for d in details:
+        if " INDEX " in d:
+            used.add(d.split(" INDEX ", 1)[1].split(" ", 1)[0])
+    return used, details
+
+
+def _postgres_plan(sql):
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    used = set()
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if "Index Name" in node:
+            used.add(node["Index Name"])
+        stack.extend(node.get("Plans", []))
+    return used, plan
+
+
+def explain(stmt):
+    """Return (index names used, raw plan) for a statement on the bound dialect."""
+    sql = _compile(stmt)
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return _sqlite_plan(sql)
+    if dialect == "postgresql":
+        return _postgres_plan(sql)
+    raise NotImplementedError(f"EXPLAIN checks are not supported on {dialect}")
+
+
+def check_query_plans():
+    """Explain every hot query; returns [{name, ok, expected, used, plan}, ...]."""
+    results = []
+    try:
+        for name, (build, expected) in HOT_QUERIES.items():
+            used, plan = explain(build())
+            results.append({
+                "name": name,
+                "ok": bool(used & expected),
+                "expected": sorted(expected),
+                "used": sorted(used),
+                "plan": plan,
+            })
+    finally:
+        db.session.rollback()  # drop SET LOCAL
+    return results
@@ -0,0 +1,155 @@
+"""
+Token-bucket scheduler for the Riot API rate limits.
+
+Riot enforces an application limit per routing region and a method limit per
+endpoint, each made of several "requests:seconds" windows (e.g. ``20:1,100:120``).
+A request may only go out when every bucket it belongs to still has a token.
+Buckets are refilled all at once when their window expires, which mirrors how
+Riot counts requests, and are re-synchronised from the ``X-*-Rate-Limit`` and
+``X-*-Rate-Limit-Count`` headers returned with every response.
+"""
+import threading
+import time
+
+DEFAULT_APP_LIMITS = "20:1,100:120"
+WINDOW_MARGIN_SEC = 0.05  # our clock and Riot's never start a window at exactly the same instant
+
+
+def parse_limits(value):
+    """Parse a Riot limit header such as "20:1,100:120" into [(count, window_sec), ...]."""
+    limits = []
+    for part in (value or "").split(","):
+        count, _, window = part.strip().partition(":")
+        if count.isdigit() and window.isdigit() and int(window) > 0:
+            limits.append((int(count), int(window)))
+    return limits
+
+
+class TokenBucket:
+    """`limit` tokens per `window` seconds; the window starts on the first request."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.used = 0
+        self.reset_at = 0.0
+
+    def wait_time(self, now):
+        if now >= self.reset_at or self.used < self.limit:
+            return 0.0
+        return self.reset_at - now
+
+    def take(self, now):
+        if now >= self.reset_at:
+            self.used = 0
+            self.reset_at = now + self.window + WINDOW_MARGIN_SEC
+        self.used += 1
+
+    def sync(self, used, now):
+        """Adopt the server's view of how many requests this window has seen."""
+        if now >= self.reset_at:
+            self.reset_at = now + self.window + WINDOW_MARGIN_SEC
+        self.used = max(self.used, used)
+
+
+class RateLimiter:
+    """A set of buckets (one per window) that must all grant a token."""
+
+    def __init__(self, limits=()):
+        self.buckets = {}
+        self.blocked_until = 0.0
+        self.configure(limits)
+
+    def configure(self, limits):
+        buckets = {}
+        for limit, window in limits:
+            bucket = self.buckets.get(window) or TokenBucket(limit, window)
+            bucket.limit = limit
+            buckets[window] = bucket
+        self.buckets = buckets
+
+    def wait_time(self, now):
+        waits = [b.wait_time(now) for b in self.buckets.values()]
+        waits.append(self.blocked_until - now)
+        return max(0.0, *waits)
+
+    def take(self, now):
+        for bucket in self.buckets.values():
+            bucket.take(now)
+
+    def sync_counts(self, counts, now):
+        for used, window in counts:
+            bucket = self.buckets.get(window)
+            if bucket:
+                bucket.sync(used, now)
+
+    def block(self, seconds, now):
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RiotRateScheduler:
+    """
+    Shared gate for every outgoing Riot request in this process.
+
+    `acquire(region, method)` blocks until both the region's app limiter and the
+    (region, method) limiter have capacity; `observe(...)` feeds the response
+    headers back so the limits track whatever Riot actually granted our key.
+    """
+
+    def __init__(self, app_limits=DEFAULT_APP_LIMITS):
+        self._lock = threading.Lock()
+        self._default_app_limits = parse_limits(app_limits)
+        self._app = {}
+        self._methods = {}
+
+    def _app_limiter(self, region):
+        app = self._app.get(region)
+        if app is None:
+            app = self._app[region] = RateLimiter(self._default_app_limits)
+        return app
+
+    def _limiters(self, region, method):
+        app = self._app_limiter(region)
+        key = (region, method)
+        meth = self._methods.get(key)
+        if meth is None:
+            # Method limits are unknown until the first response tells us
+            meth = self._methods[key] = RateLimiter()
+        return app, meth
+
+    def acquire(self, region, method):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                app, meth = self._limiters(region, method)
+                wait = max(app.wait_time(now), meth.wait_time(now))
+                if wait <= 0:
+                    app.take(now)
+                    meth.take(now)
+                    return
+            time.sleep(wait)
+
+    def observe(self, region, method, resp):
+        headers = resp.headers
+        with self._lock:
+            now = time.monotonic()
+            app, meth = self._limiters(region, method)
+            for limiter, prefix in ((app, "X-App-Rate-Limit"), (meth, "X-Method-Rate-Limit")):
+                limits = parse_limits(headers.get(prefix))
+                if limits:
+                    limiter.configure(limits)
+                counts = parse_limits(headers.get(f"{prefix}-Count"))
+                if counts:
+                    limiter.sync_counts(counts, now)
+
+            if resp.status_code == 429:
+                retry_after = headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    # "method" limits only stall this endpoint; app and service limits stall the region
+                    target = meth if headers.get("X-Rate-Limit-Type") == "method" else app
+                    target.block(int(retry_after), now)
+
+    def backoff(self, region, seconds):
+        """Pause a region when Riot returns 429 without telling us for how long."""
+        with self._lock:
+            self._app_limiter(region).block(seconds, time.monotonic())
@@ -0,0 +1,189 @@
+"""
+Response cache for the read-only per-player endpoints.
+
+`cached_player_view` wraps a view taking `puuid`: the cache key is the
+endpoint, path and query string plus the player's data version
+(`last_updated` and `data_changed_at`, which ingestion bumps for every player
+it adds games to in the same transaction). A sync therefore invalidates the
+player's cached pages as soon as it commits, in every process, without any
+explicit purge. The key doubles as a weak ETag and the data version as
+Last-Modified, so clients polling an unchanged player get a 304.
+
+Backends: `MemoryBackend` (LRU, per process) or `SQLiteBackend` (one file
+shared by all workers on the host), selected with RESPONSE_CACHE_BACKEND.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from services import player_service
+
+CACHE_FORMAT = 1  # bump when cached payload formats change
+EVICT_TO_RATIO = 0.9
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (status, mimetype, body)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, status, mimetype, body):
+        with self._lock:
+            self._entries[key] = (status, mimetype, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    def __init__(self, path, max_entries=50000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " status INTEGER NOT NULL,"
+            " mimetype TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT status, mimetype, body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def put(self, key, status, mimetype, body):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, mimetype, body, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, status, mimetype, body, time.time()),
+            )
+            self._count += 1
+            if self._count > self.max_entries:
+                # Other workers write to the same file, so count for real before evicting
+                self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                excess = self._count - int(self.max_entries * EVICT_TO_RATIO)
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN"
+                        " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                        (excess,),
+                    )
+                    self._count -= excess
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._count = 0
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide backend for the current app, or None when RESPONSE_CACHE_BACKEND is "none"."""
+    kind = current_app.config.get("RESPONSE_CACHE_BACKEND", "memory")
+    if kind == "none":
+        return None
+    max_entries = current_app.config["RESPONSE_CACHE_MAX_ENTRIES"]
+    path = current_app.config.get("RESPONSE_CACHE_PATH")
+    with _backends_lock:
+        backend = _backends.get((kind, path))
+        if backend is None:
+            if kind == "sqlite":
+                backend = SQLiteBackend(path, max_entries)
+            elif kind == "memory":
+                backend = MemoryBackend(max_entries)
+            else:
+                raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {kind!r}")
+            _backends[(kind, path)] = backend
+        return backend
+
+
+def _last_modified(player):
+    # last_updated is naive local time, data_changed_at naive UTC
+    stamps = []
+    if player.last_updated:
+        stamps.append(player.last_updated.astimezone(timezone.utc))
+    if player.data_changed_at:
+        stamps.append(player.data_changed_at.replace(tzinfo=timezone.utc))
+    return max(stamps) if stamps else None
+
+
+def _cache_key(player):
+    args = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    version = [stamp.isoformat() if stamp else "" for stamp in (player.last_updated, player.data_changed_at)]
+    raw = f"{CACHE_FORMAT}|{request.endpoint}|{request.path}|{args}|{'|'.join(version)}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = "no-cache"  # always revalidate; revalidation is cheap
+    return response
+
+
+def cached_player_view(view):
+    """Serve a per-player GET view from the response cache, answering conditional requests with 304."""
+    @wraps(view)
+    def wrapper(puuid, **kwargs):
+        player = player_service.get_player_by_puuid(puuid)
+        if not player:
+            return view(puuid, **kwargs)
+
+        key = _cache_key(player)
+        last_modified = _last_modified(player)
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(key)
+        else:
+            not_modified = bool(
+                last_modified and request.if_modified_since
+                and last_modified.replace(microsecond=0) <= request.if_modified_since
+            )
+        if not_modified:
+            return _validators(current_app.response_class(status=304), key, last_modified)
+
+        backend = get_response_cache()
+        cached = backend.get(key) if backend else None
+        if cached:
+            status, mimetype, body = cached
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+            response.headers["X-Cache"] = "hit"
+            return _validators(response, key, last_modified)
+
+        response = make_response(view(puuid, **kwargs))
+        if response.status_code != 200:
+            return response
+        if backend:
+            backend.put(key, response.status_code, response.mimetype, response.get_data())
+            response.headers["X-Cache"] = "miss"
+        return _validators(response, key, last_modified)
+    return wrapper
@@ -0,0 +1,163 @@
+"""
+Year-in-review ("Rewind") report engine.
+
+The report is computed in one pass over the player's participant rows for the
+year (a single range read on ix_participants_player_timestamp) and stored as a
+JSON snapshot tagged with the player's data version (`last_updated` and
+`data_changed_at`). The snapshot is served as-is until a sync changes either
+or REPORT_VERSION changes.
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+
+from extensions import db
+from models.schema import Match, Participant, RewindSnapshot
+from services.db_utils import upsert_insert
+
+REPORT_VERSION = 1
+TOP_CHAMPIONS = 5
+NOTABLE_GAMES = 3
+
+
+def _data_version(player):
+    # Same version as the response cache: other players' syncs bump data_changed_at only
+    return "|".join(s.isoformat() if s else "never" for s in (player.last_updated, player.data_changed_at))
+
+
+def _kda(kills, deaths, assists):
+    return round((kills + assists) / max(deaths, 1), 2)
+
+
+def _game(row):
+    return {
+        "match_id": row.riot_match_id,
+        "date": row.timestamp.date().isoformat(),
+        "champion_name": row.champion_name,
+        "role": row.role,
+        "win": bool(row.win),
+        "kills": row.kills or 0,
+        "deaths": row.deaths or 0,
+        "assists": row.assists or 0,
+        "kda": _kda(row.kills or 0, row.deaths or 0, row.assists or 0),
+        "damage_dealt": row.damage_dealt or 0,
+    }
+
+
+def build_rewind(player_id, year):
+    """Compute the full report for one player and year in a single pass over their rows."""
+    q = (
+        select(
+            Participant.champion_name, Participant.role, Participant.win, Participant.kills,
+            Participant.deaths, Participant.assists, Participant.gold_earned, Participant.damage_dealt,
+            Participant.timestamp, Match.match_id.label("riot_match_id"), Match.queue_id,
+        )
+        .join(Match, Match.id == Participant.match_id)
+        .where(
+            Participant.player_id == player_id,
+            Participant.timestamp >= datetime(year, 1, 1),
+            Participant.timestamp < datetime(year + 1, 1, 1),
+        )
+        .order_by(Participant.timestamp)
+    )
+
+    totals = {"games": 0, "wins": 0, "kills": 0, "deaths": 0, "assists": 0, "gold_earned": 0, "damage_dealt": 0}
+    champions, roles, queues, months, days = {}, {}, {}, {}, {}
+    streak = {"win": None, "loss": None}
+    current = None  # (win, length, start_date)
+    games = []
+
+    for row in db.session.execute(q):
+        win = bool(row.win)
+        date = row.timestamp.date().isoformat()
+        kills, deaths, assists = row.kills or 0, row.deaths or 0, row.assists or 0
+
+        totals["games"] += 1
+        totals["wins"] += win
+        totals["kills"] += kills
+        totals["deaths"] += deaths
+        totals["assists"] += assists
+        totals["gold_earned"] += row.gold_earned or 0
+        totals["damage_dealt"] += row.damage_dealt or 0
+
+        c = champions.setdefault(row.champion_name, {"games": 0, "wins": 0, "kills": 0, "deaths": 0, "assists": 0})
+        c["games"] += 1
+        c["wins"] += win
+        c["kills"] += kills
+        c["deaths"] += deaths
+        c["assists"] += assists
+
+        roles[row.role or "NONE"] = roles.get(row.role or "NONE", 0) + 1
+        queues[row.queue_id] = queues.get(row.queue_id, 0) + 1
+        m = months.setdefault(date[:7], {"games": 0, "wins": 0})
+        m["games"] += 1
+        m["wins"] += win
+        d = days.setdefault(date, {"games": 0, "wins": 0})
+        d["games"] += 1
+        d["wins"] += win
+
+        # Rows arrive in time order, so streaks are a running count
+        if current and current[0] == win:
+            current = (win, current[1] + 1, current[2])
+        else:
+            current = (win, 1, date)
+        key = "win" if win else "loss"
+        if streak[key] is None or current[1] > streak[key]["length"]:
+            streak[key] = {"length": current[1], "start": current[2], "end": date}
+
+        games.append(_game(row))
+
+    n = totals["games"]
+    top = sorted(champions.items(), key=lambda kv: (-kv[1]["games"], -kv[1]["wins"]))[:TOP_CHAMPIONS]
+    ranked = sorted(games, key=lambda g: (g["kda"], g["win"], g["damage_dealt"]))
+
+    return {
+        "year": year,
+        "totals": {
+            **totals,
+            "losses": n - totals["wins"],
+            "win_rate": round(totals["wins"] / n, 4) if n else None,
+            "kda": _kda(totals["kills"], totals["deaths"], totals["assists"]) if n else None,
+            "avg_gold": round(totals["gold_earned"] / n, 1) if n else None,
+            "avg_damage": round(totals["damage_dealt"] / n, 1) if n else None,
+            "days_played": len(days),
+        },
+        "top_champions": [
+            {
+                "champion_name": name,
+                "games": c["games"],
+                "wins": c["wins"],
+                "win_rate": round(c["wins"] / c["games"], 4),
+                "kda": _kda(c["kills"], c["deaths"], c["assists"]),
+            }
+            for name, c in top
+        ],
+        "streaks": {"longest_win": streak["win"], "longest_loss": streak["loss"]},
+        "monthly_activity": [{"month": k, **v} for k, v in sorted(months.items())],
+        "calendar": days,
+        "role_distribution": roles,
+        "queue_distribution": {str(k): v for k, v in queues.items()},
+        "best_games": list(reversed(ranked[-NOTABLE_GAMES:])),
+        "worst_games": ranked[:NOTABLE_GAMES],
+    }
+
+
+def get_rewind(player, year):
+    """Return (report, cached) for a player, rebuilding the snapshot if it is stale."""
+    version = _data_version(player)
+    snapshot = RewindSnapshot.query.filter_by(player_id=player.id, year=year).first()
+    if snapshot and snapshot.report_version == REPORT_VERSION and snapshot.data_version == version:
+        return snapshot.payload, True
+
+    report = build_rewind(player.id, year)
+    stmt = upsert_insert(RewindSnapshot).values(
+        player_id=player.id, year=year, report_version=REPORT_VERSION,
+        data_version=version, payload=report, created_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["player_id", "year"],
+        set_={c: stmt.excluded[c] for c in ("report_version", "data_version", "payload", "created_at")},
+    )
+    db.session.execute(stmt)
+    db.session.commit()
+    return report, False
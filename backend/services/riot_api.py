@@ -1,39 +1,141 @@
+import threading
 import time
-from flask import current_app
+from urllib.parse import quote
+
+from flask import current_app, has_app_context
 import requests
+from requests.adapters import HTTPAdapter
 from config import Config
+from services.match_cache import TIMELINE_SUFFIX, get_match_cache
+from services.rate_limiter import RiotRateScheduler
+
+MAX_ATTEMPTS = 6
+
+ROUTING_REGIONS = ("americas", "europe", "asia", "sea")
+# Platform (match id prefix / platformId) -> match-v5 routing region
+PLATFORM_REGIONS = {
+    "NA1": "americas", "BR1": "americas", "LA1": "americas", "LA2": "americas",
+    "EUW1": "europe", "EUN1": "europe", "TR1": "europe", "RU": "europe", "ME1": "europe",
+    "KR": "asia", "JP1": "asia",
+    "OC1": "sea", "PH2": "sea", "SG2": "sea", "TH2": "sea", "TW2": "sea", "VN2": "sea",
+}
+
+# One scheduler per process so every sync thread draws from the same budget
+rate_scheduler = RiotRateScheduler(Config.RIOT_APP_RATE_LIMIT)
+
+
+class RiotClient:
+    """
+    Keep-alive HTTP client for one Riot routing region (americas, europe, asia, sea)
+    or platform (na1, euw1, ... for per-server APIs such as champion mastery).
+
+    Requests share a pooled ``requests.Session`` so the TCP/TLS handshake to
+    ``{region}.api.riotgames.com`` is paid once per pooled connection instead of
+    once per call. ``transport`` replaces the default connection-pooling adapter
+    and ``base_url`` redirects the client, e.g. to a local stub Riot server.
+    """
+
+    def __init__(self, region, api_key=None, base_url=None, timeout=None,
+                 pool_size=None, transport=None, scheduler=None):
+        self.region = region
+        self.base_url = (base_url or Config.RIOT_API_BASE_URL).format(region=region).rstrip("/")
+        self.timeout = timeout or (Config.RIOT_CONNECT_TIMEOUT, Config.RIOT_READ_TIMEOUT)
+        self.scheduler = scheduler or rate_scheduler
+
+        self.session = requests.Session()
+        self.session.headers["X-Riot-Token"] = api_key or Config.RIOT_API_KEY or ""
+        adapter = transport or HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size or Config.RIOT_HTTP_POOL_SIZE,
+            max_retries=0,  # retries are handled below, under the rate scheduler
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path, method, params=None):
+        """GET through the shared rate scheduler, retrying 429s, 5xx and network errors."""
+        url = f"{self.base_url}{path}"
+        for attempt in range(MAX_ATTEMPTS):
+            self.scheduler.acquire(self.region, method)
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                time.sleep(min(2 ** attempt, 16))
+                continue
+            self.scheduler.observe(self.region, method, resp)
+            if resp.status_code == 429:
+                if not resp.headers.get("Retry-After"):
+                    self.scheduler.backoff(self.region, min(2 ** attempt, 16))
+                continue
+            if resp.status_code >= 500:
+                time.sleep(min(2 ** attempt, 16))
+                continue
+            return resp
+        return resp
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_client_options = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(region="americas"):
+    """Return the process-wide client for a routing region, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(region)
+        if client is None:
+            options = dict(_client_options)
+            if has_app_context():
+                options.setdefault("api_key", current_app.config.get("RIOT_API_KEY"))
+            client = _clients[region] = RiotClient(region, **options)
+        return client
+
+
+def configure_clients(**options):
+    """
+    Replace the options used to build region clients (base_url, transport, timeout, ...).
+
+    Existing clients are closed so the next call picks up the new settings.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _client_options.clear()
+        _client_options.update(options)
+
+
+def region_for_match_id(match_id, default="americas"):
+    """Routing region of a match id such as "EUW1_7012345678"."""
+    return PLATFORM_REGIONS.get(match_id.split("_", 1)[0].upper(), default)
+
+
+def lookup_account(game_name, tag_line, region="americas"):
+    """(status code, puuid or None) of the account-v1 lookup for a Riot ID."""
+    path = f"/riot/account/v1/accounts/by-riot-id/{quote(game_name)}/{quote(tag_line)}"
+    resp = get_client(region).get(path, "account-by-riot-id")
+
+    if resp.status_code == 200:
+        return resp.status_code, resp.json().get("puuid")
+    current_app.logger.warning("account lookup failed for %s#%s: %s", game_name, tag_line, resp.status_code)
+    return resp.status_code, None
+
 
 def get_puuid(game_name, tag_line, region="americas"):
     """Fetch the puuid for a given Riot ID (game_name#tag_line)"""
-    url = f"https://{region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-    headers = {
-        "X-Riot-Token": Config.RIOT_API_KEY
-    }
-    resp = requests.get(url, headers=headers)
+    return lookup_account(game_name, tag_line, region)[1]
 
-    if resp.status_code == 200:
-        data = resp.json()
-        return data.get("puuid")
-    else:
-        print("Error:", resp.status_code, resp.json())
-    return None
-
-
-def _sleep_on_429(resp, attempt):
-    if resp.status_code != 429:
-        return False
-    retry_after = resp.headers.get("Retry-After")
-    if retry_after:
-        time.sleep(int(retry_after))
-    else:
-        time.sleep(min(2 ** attempt, 16))
-    return True
-
-def get_match_ids_since(puuid, start_time, end_time, region="americas", batch=100):
-    """Yield match IDs in pages, resilient to 429 and partial failures."""
-    url = f"https://{region}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids"
-    headers = {"X-Riot-Token": Config.RIOT_API_KEY}
-    start = 0
+
+def get_match_ids_since(puuid, start_time, end_time, region="americas", batch=100, offset=0):
+    """Yield match IDs (newest first) in pages, resilient to 429 and partial failures; `offset` skips the first ids."""
+    client = get_client(region)
+    path = f"/lol/match/v5/matches/by-puuid/{puuid}/ids"
+    start = offset
 
     while True:
         params = {
@@ -42,14 +144,8 @@ def get_match_ids_since(puuid, start_time, end_time, region="americas", batch=10
             "start": start,
             "count": batch
         }
-        attempt = 0
-        while True:
-            resp = requests.get(url, headers=headers, params=params)
-            if resp.status_code == 200:
-                break
-            if _sleep_on_429(resp, attempt):
-                attempt += 1
-                continue
+        resp = client.get(path, "match-ids-by-puuid", params=params)
+        if resp.status_code != 200:
             # log & stop this page on other errors
             current_app.logger.warning("match ids error %s: %s", resp.status_code, resp.text)
             return
@@ -60,19 +156,42 @@ def get_match_ids_since(puuid, start_time, end_time, region="americas", batch=10
         for mid in ids:
             yield mid
         start += batch
-        time.sleep(0.1)  # gentle pacing
-        
+
+
+def get_champion_masteries(puuid, platform):
+    """champion-mastery-v4 entries of a player; `platform` is its server (e.g. "NA1"), not a routing region."""
+    resp = get_client(platform.lower()).get(
+        f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}", "champion-masteries-by-puuid"
+    )
+    if resp.status_code == 200:
+        return resp.json()
+    raise RuntimeError(f"Mastery fetch for {puuid} failed {resp.status_code}: {resp.text}")
+
+
+def _get_cached_payload(key, path, method, region):
+    """GET an immutable payload, served from the local raw match cache when present."""
+    cache = get_match_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    resp = get_client(region).get(path, method)
+    if resp.status_code == 200:
+        payload = resp.json()
+        if cache is not None:
+            cache.put(key, payload)
+        return payload
+    raise RuntimeError(f"Fetch {key} failed {resp.status_code}: {resp.text}")
+
 
 def get_match_detail(match_id, region="americas"):
-    url = f"https://{region}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    headers = {"X-Riot-Token": current_app.config["RIOT_API_KEY"]}
+    """Return a match-v5 payload, served from the local raw match cache when present."""
+    return _get_cached_payload(match_id, f"/lol/match/v5/matches/{match_id}", "match-by-id", region)
 
-    attempt = 0
-    while True:
-        resp = requests.get(url, headers=headers)
-        if resp.status_code == 200:
-            return resp.json()
-        if _sleep_on_429(resp, attempt):
-            attempt += 1
-            continue
-        raise RuntimeError(f"Fetch match {match_id} failed {resp.status_code}: {resp.text}")
\ No newline at end of file
+
+def get_match_timeline(match_id, region="americas"):
+    """Return a match-v5 timeline (per-minute frames and events), cached like match details."""
+    return _get_cached_payload(
+        f"{match_id}{TIMELINE_SUFFIX}", f"/lol/match/v5/matches/{match_id}/timeline", "match-timeline", region
+    )
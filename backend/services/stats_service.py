@@ -0,0 +1,132 @@
+"""
+Per-player aggregate stats served from the `player_stats` rollup.
+
+`ingest_matches` calls `record_participants` with the participant rows it has
+just inserted, which folds them into one rollup row per
+(player, champion, role, queue, month) with an additive ON CONFLICT upsert.
+Reads only ever touch the rollup, never `participants`.
+"""
+from sqlalchemy import func, select
+
+from extensions import db
+from models.schema import Match, Participant, PlayerStat
+from services.db_utils import chunked, upsert_insert
+
+SUM_COLUMNS = ("games", "wins", "kills", "deaths", "assists", "gold_earned", "damage_dealt")
+GROUP_COLUMNS = {
+    "champion": PlayerStat.champion_name,
+    "role": PlayerStat.role,
+    "queue": PlayerStat.queue_id,
+    "month": PlayerStat.month,
+}
+UPSERT_CHUNK = 500
+
+
+def _rollup(participant_rows, match_meta, deltas=None):
+    """Aggregate participant rows into rollup deltas keyed by the rollup's unique key."""
+    deltas = {} if deltas is None else deltas
+    for p in participant_rows:
+        queue_id, timestamp = match_meta[p["match_id"]]
+        key = (p["player_id"], p["champion_name"], p["role"] or "", queue_id or 0, timestamp.strftime("%Y-%m"))
+        d = deltas.get(key)
+        if d is None:
+            d = deltas[key] = dict.fromkeys(SUM_COLUMNS, 0)
+        d["games"] += 1
+        d["wins"] += 1 if p["win"] else 0
+        d["kills"] += p["kills"] or 0
+        d["deaths"] += p["deaths"] or 0
+        d["assists"] += p["assists"] or 0
+        d["gold_earned"] += p["gold_earned"] or 0
+        d["damage_dealt"] += p["damage_dealt"] or 0
+    return deltas
+
+
+def _apply(deltas):
+    rows = [
+        {"player_id": k[0], "champion_name": k[1], "role": k[2], "queue_id": k[3], "month": k[4], **d}
+        for k, d in deltas.items()
+    ]
+    for chunk in chunked(rows, UPSERT_CHUNK):
+        stmt = upsert_insert(PlayerStat).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["player_id", "champion_name", "role", "queue_id", "month"],
+            set_={c: getattr(PlayerStat, c) + getattr(stmt.excluded, c) for c in SUM_COLUMNS},
+        )
+        db.session.execute(stmt)
+
+
+def record_participants(participant_rows, match_meta):
+    """
+    Fold newly inserted participants into the rollup.
+
+    `match_meta` maps matches.id -> (queue_id, timestamp). Callers must pass
+    each participant exactly once (i.e. only rows they actually inserted).
+    """
+    if participant_rows:
+        _apply(_rollup(participant_rows, match_meta))
+
+
+def rebuild_player_stats(batch=5000):
+    """Recompute the whole rollup from `participants` (e.g. after a re-ingest)."""
+    PlayerStat.query.delete()
+    q = (
+        select(
+            Participant.match_id, Participant.player_id, Participant.champion_name, Participant.role,
+            Participant.win, Participant.kills, Participant.deaths, Participant.assists,
+            Participant.gold_earned, Participant.damage_dealt, Match.queue_id, Match.timestamp,
+        )
+        .join(Match, Match.id == Participant.match_id)
+        .execution_options(yield_per=batch)
+    )
+    deltas = {}
+    count = 0
+    for rows in db.session.execute(q).mappings().partitions():
+        _rollup(rows, {r["match_id"]: (r["queue_id"], r["timestamp"]) for r in rows}, deltas)
+        count += len(rows)
+    _apply(deltas)
+    return count
+
+
+def _summarize(values):
+    games = values["games"] or 0
+    deaths = values["deaths"] or 0
+    out = {c: values[c] or 0 for c in SUM_COLUMNS}
+    out["losses"] = games - out["wins"]
+    out["win_rate"] = round(out["wins"] / games, 4) if games else None
+    out["kda"] = round((out["kills"] + out["assists"]) / max(deaths, 1), 2) if games else None
+    out["avg_gold"] = round(out["gold_earned"] / games, 1) if games else None
+    out["avg_damage"] = round(out["damage_dealt"] / games, 1) if games else None
+    return out
+
+
+def get_player_stats(player_id, champion=None, role=None, queue_id=None,
+                     month_from=None, month_to=None, group_by="champion"):
+    """Totals and per-group breakdown for one player, read from the rollup only."""
+    filters = [PlayerStat.player_id == player_id]
+    if champion:
+        filters.append(PlayerStat.champion_name == champion)
+    if role:
+        filters.append(PlayerStat.role == role)
+    if queue_id is not None:
+        filters.append(PlayerStat.queue_id == queue_id)
+    if month_from:
+        filters.append(PlayerStat.month >= month_from)
+    if month_to:
+        filters.append(PlayerStat.month <= month_to)
+
+    sums = [func.sum(getattr(PlayerStat, c)).label(c) for c in SUM_COLUMNS]
+    totals = db.session.execute(select(*sums).where(*filters)).mappings().one()
+
+    group_col = GROUP_COLUMNS[group_by]
+    groups = db.session.execute(
+        select(group_col.label("key"), *sums)
+        .where(*filters)
+        .group_by(group_col)
+        .order_by(func.sum(PlayerStat.games).desc())
+    ).mappings().all()
+
+    return {
+        "totals": _summarize(totals),
+        "group_by": group_by,
+        "groups": [{group_by: g["key"], **_summarize(g)} for g in groups],
+    }
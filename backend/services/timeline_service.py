@@ -0,0 +1,124 @@
+"""
+Match timeline storage and kill/death/assist heatmaps.
+
+Only CHAMPION_KILL events are kept, packed per match into int16/int8 arrays
+(see MatchTimeline). A heatmap reads the player's participant rows joined to
+those arrays, selects the events the player was involved in with NumPy masks
+and bins the positions with `numpy.histogram2d`. Binned results are cached
+per player and invalidated when a sync bumps `Player.last_updated` or
+`Player.data_changed_at`.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import select
+
+from extensions import db
+from models.schema import MatchTimeline, Participant
+from services.db_utils import chunked, upsert_insert
+
+MAP_SIZE = 15000  # Summoner's Rift coordinates run from 0 to ~14900 on both axes
+SIDES = {"blue": 100, "red": 200, "100": 100, "200": 200}
+KINDS = ("deaths", "kills", "assists")
+MAX_BINS = 128
+HEATMAP_CACHE_SIZE = 512
+INSERT_CHUNK = 200
+
+
+def pack_kill_events(timeline_json):
+    """Extract CHAMPION_KILL events from a timeline into packed column arrays."""
+    xs, ys, killers, victims, assists = [], [], [], [], []
+    for frame in timeline_json["info"]["frames"]:
+        for event in frame.get("events", []):
+            if event.get("type") != "CHAMPION_KILL" or "position" not in event:
+                continue
+            xs.append(event["position"]["x"])
+            ys.append(event["position"]["y"])
+            killers.append(event.get("killerId", 0))
+            victims.append(event.get("victimId", 0))
+            mask = 0
+            for pid in event.get("assistingParticipantIds") or []:
+                mask |= 1 << pid
+            assists.append(mask)
+    return {
+        "event_count": len(xs),
+        "x": np.asarray(xs, dtype="<i2").tobytes(),
+        "y": np.asarray(ys, dtype="<i2").tobytes(),
+        "killer": np.asarray(killers, dtype="i1").tobytes(),
+        "victim": np.asarray(victims, dtype="i1").tobytes(),
+        "assists": np.asarray(assists, dtype="<i2").tobytes(),
+    }
+
+
+def store_timelines(timelines_by_match_pk):
+    """Insert packed timelines for {matches.id: timeline_json}; existing rows are left alone."""
+    rows = [{"match_id": pk, **pack_kill_events(t)} for pk, t in timelines_by_match_pk.items()]
+    for chunk in chunked(rows, INSERT_CHUNK):
+        db.session.execute(
+            upsert_insert(MatchTimeline).values(chunk).on_conflict_do_nothing(index_elements=["match_id"])
+        )
+
+
+_heatmaps = OrderedDict()
+_heatmaps_lock = threading.Lock()
+
+
+def _positions(player_id, champion, team_id, kind):
+    q = (
+        select(Participant.participant_id, MatchTimeline.x, MatchTimeline.y,
+               MatchTimeline.killer, MatchTimeline.victim, MatchTimeline.assists)
+        .join(MatchTimeline, MatchTimeline.match_id == Participant.match_id)
+        .where(Participant.player_id == player_id, Participant.participant_id.is_not(None))
+    )
+    if champion:
+        q = q.where(Participant.champion_name == champion)
+    if team_id:
+        q = q.where(Participant.team_id == team_id)
+
+    xs, ys = [], []
+    for pid, x, y, killer, victim, assists in db.session.execute(q):
+        if kind == "deaths":
+            mask = np.frombuffer(victim, dtype="i1") == pid
+        elif kind == "kills":
+            mask = np.frombuffer(killer, dtype="i1") == pid
+        else:
+            mask = (np.frombuffer(assists, dtype="<i2") & (1 << pid)) != 0
+        if mask.any():
+            xs.append(np.frombuffer(x, dtype="<i2")[mask])
+            ys.append(np.frombuffer(y, dtype="<i2")[mask])
+    if not xs:
+        return np.empty(0, dtype="<i2"), np.empty(0, dtype="<i2")
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+def get_heatmap(player, champion=None, side=None, kind="deaths", bins=64):
+    """
+    Binned event positions for a player: grid[row][col] counts events with
+    y in row and x in col (row 0 = bottom of the map).
+    """
+    team_id = SIDES.get(side) if side else None
+    version = tuple(s.isoformat() if s else None for s in (player.last_updated, player.data_changed_at))
+    key = (player.id, version, champion, team_id, kind, bins)
+    with _heatmaps_lock:
+        if key in _heatmaps:
+            _heatmaps.move_to_end(key)
+            return _heatmaps[key]
+
+    xs, ys = _positions(player.id, champion, team_id, kind)
+    grid, _, _ = np.histogram2d(ys, xs, bins=bins, range=[[0, MAP_SIZE], [0, MAP_SIZE]])
+    result = {
+        "kind": kind,
+        "champion": champion,
+        "side": {100: "blue", 200: "red"}.get(team_id),
+        "bins": bins,
+        "map_size": MAP_SIZE,
+        "total": int(grid.sum()),
+        "max": int(grid.max()) if grid.size else 0,
+        "grid": grid.astype(int).tolist(),
+    }
+    with _heatmaps_lock:
+        _heatmaps[key] = result
+        while len(_heatmaps) > HEATMAP_CACHE_SIZE:
+            _heatmaps.popitem(last=False)
+    return result